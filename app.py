@@ -1,27 +1,278 @@
-from flask import Flask, render_template, request, jsonify, send_file
+from flask import Flask, Request, render_template, request, jsonify, send_file, g, Response, stream_with_context
 import os
 import json
+import time
+import hashlib
+import tracemalloc
 from werkzeug.utils import secure_filename
-from document_processor import DocumentProcessor
-from question_generator import QuestionGenerator
+from document_processor import DocumentProcessor, parse_page_ranges
+from page_budget import analyze_within_budget
+from question_generator import get_question_generator, warmup, new_seed
+from extraction_cache import ExtractionCache
+from result_cache import ResultCache
+from export_cache import ExportCache
+from job_queue import Job, JobQueue, QueueFullError
+from batch_processor import BatchProcessor
+from output_files import QuestionWriter, unique_name
+from output_store import OutputStore
+from retention import RetentionPolicy
+import metrics
+import shutil
 import tempfile
 import zipfile
 from io import BytesIO
 
+class SpooledRequest(Request):
+    """Keeps uploaded files in memory, spilling to a temporary file only above UPLOAD_SPOOL_THRESHOLD"""
+    
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        return tempfile.SpooledTemporaryFile(max_size=app.config['UPLOAD_SPOOL_THRESHOLD'], mode='rb+',
+                                             dir=app.config['UPLOAD_FOLDER'])
+
 app = Flask(__name__)
+app.request_class = SpooledRequest
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
+app.config['UPLOAD_SPOOL_THRESHOLD'] = 4 * 1024 * 1024  # Uploads larger than this are spooled to UPLOAD_FOLDER
 app.config['UPLOAD_FOLDER'] = 'uploads'
 app.config['OUTPUT_FOLDER'] = 'outputs'
+app.config['CACHE_FOLDER'] = 'cache'
+app.config['CACHE_MAX_BYTES'] = 256 * 1024 * 1024  # 256MB of cached document analyses
+app.config['JOB_WORKERS'] = 2  # Background threads processing async uploads
+app.config['JOB_QUEUE_SIZE'] = 16  # Max queued + running async uploads before returning 429
+app.config['BATCH_WORKERS'] = 4  # Threads processing the documents of a /batch request
+app.config['BATCH_MAX_ZIP_MEMBERS'] = 1000  # Documents one /batch zip archive may contain
+app.config['BATCH_MAX_ZIP_BYTES'] = 256 * 1024 * 1024  # Uncompressed size of the documents of one /batch zip archive
+app.config['PDF_WORKERS'] = 1  # Processes extracting pages of large PDFs, one pool per server process; 1 extracts in the request thread
+app.config['EXTRACTION_SAMPLE_PAGES'] = 10  # First page sample of long PDFs, grown as the paper needs; 0 reads every page
+app.config['RESULT_CACHE_ENTRIES'] = 256  # Generated papers kept in memory by (document, requirements, seed)
+app.config['EXPORT_CACHE_ENTRIES'] = 64  # Rendered PDF/Word exports kept in memory by (questions, format)
+app.config['EXPORT_SPOOL_QUESTIONS'] = 500  # Larger papers are rendered once into OUTPUT_FOLDER instead of the in-memory export cache
+app.config['METRICS_TIMING_HEADERS'] = False  # Add a Server-Timing header with per-stage durations
+app.config['METRICS_TRACE_MEMORY'] = False  # Record peak allocation per stage (tracemalloc slows every allocation)
+app.config['SERVER_THREADS'] = 8  # Request threads per process in production mode (serve.py)
+app.config['OUTPUT_ENCODING'] = 'gzip'  # Stored result encoding: gzip, zstd (needs zstandard) or identity
+app.config['RETENTION_MAX_AGE'] = 7 * 24 * 3600  # Delete results and upload leftovers older than this (seconds); 0 keeps them
+app.config['RETENTION_MAX_BYTES'] = 1024 * 1024 * 1024  # Size quota of outputs/ and uploads/ together; oldest go first; 0 disables
+app.config['RETENTION_INTERVAL'] = 600  # Seconds between retention passes of the background collector
+app.config['RETENTION_MIN_AGE'] = 3600  # The size quota never removes entries modified more recently than this (seconds)
+
+# Memory tracing starts with the app, so every server (app.py, serve.py, each gunicorn worker) records stage peaks
+if app.config['METRICS_TRACE_MEMORY']:
+    tracemalloc.start()
 
 # Ensure directories exist
 os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
 os.makedirs(app.config['OUTPUT_FOLDER'], exist_ok=True)
 
+# Compressed question papers served by /download and /export
+output_store = OutputStore(app.config['OUTPUT_FOLDER'], app.config['OUTPUT_ENCODING'])
+
+# Background collector keeping outputs/ and uploads/ within their age and size limits
+retention = RetentionPolicy([app.config['OUTPUT_FOLDER'], app.config['UPLOAD_FOLDER']],
+                            app.config['RETENTION_MAX_AGE'], app.config['RETENTION_MAX_BYTES'],
+                            app.config['RETENTION_INTERVAL'], app.config['RETENTION_MIN_AGE'])
+retention.start()
+
+# Analyses of previously uploaded documents, keyed by file content hash
+extraction_cache = ExtractionCache(app.config['CACHE_FOLDER'], app.config['CACHE_MAX_BYTES'])
+
+# Generated papers, so regenerating with the same seed returns instantly
+result_cache = ResultCache(app.config['RESULT_CACHE_ENTRIES'])
+export_cache = ExportCache(app.config['EXPORT_CACHE_ENTRIES'], app.config['OUTPUT_FOLDER'])
+
+# Worker pool for uploads submitted with async=true
+job_queue = JobQueue(app.config['JOB_WORKERS'], app.config['JOB_QUEUE_SIZE'])
+
+# Document reader shared by uploads and /batch, so all requests share one page extraction pool
+processor = DocumentProcessor(workers=app.config['PDF_WORKERS'])
+
+# Shared generator and processor for /batch requests
+batch_processor = BatchProcessor(workers=app.config['BATCH_WORKERS'], processor=processor, cache=extraction_cache,
+                                 result_cache=result_cache, sample_pages=app.config['EXTRACTION_SAMPLE_PAGES'] or None)
+
 ALLOWED_EXTENSIONS = {'pdf', 'docx', 'doc'}
 
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+    g.stage_timings = {}
+
+@app.after_request
+def record_request_metrics(response):
+    endpoint = request.endpoint or 'unknown'
+    if 'request_started' in g:
+        metrics.REQUEST_SECONDS.observe(time.perf_counter() - g.request_started, endpoint=endpoint)
+    metrics.REQUESTS.inc(endpoint=endpoint, status=response.status_code)
+    if app.config['METRICS_TIMING_HEADERS'] and g.get('stage_timings'):
+        response.headers['Server-Timing'] = metrics.server_timing_header(g.stage_timings)
+    return response
+
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
+def read_requirements(form):
+    """Get question requirements from form fields"""
+    return {
+        'mcq_count': int(form.get('mcq_count', 5)),
+        'short_answer_count': int(form.get('short_answer_count', 3)),
+        'long_answer_count': int(form.get('long_answer_count', 2)),
+        'difficulty': form.get('difficulty', 'medium'),
+        # Optional 1-based page ranges, e.g. "1-10,15"
+        'pages': parse_page_ranges(form['pages']) if form.get('pages', '').strip() else None
+    }
+
+def read_seed(form):
+    """Get the generation seed from the form, or pick a fresh one"""
+    seed = form.get('seed', '').strip()
+    return int(seed) if seed else new_seed()
+
+def process_document(source, filename, requirements, seed, job=None, timings=None):
+    """
+    Run the extract/analyze/generate/write pipeline for one uploaded document,
+    given as a path or a binary stream. Stage progress is recorded on job when
+    running in the background queue, and stage durations are added to timings
+    when given.
+    """
+    progress = job or Job()
+    generator = get_question_generator()
+    
+    # Reuse the paper, or else the extraction and analysis, of an identical earlier upload
+    analysis = None
+    with metrics.stage('cache_lookup', timings):
+        content_hash = ExtractionCache.hash_file(source)
+        result_key = ResultCache.key(content_hash, requirements, seed)
+        questions = result_cache.get(result_key)
+    if questions is None:
+        analysis = load_analysis(source, filename, content_hash, requirements, progress, timings)
+    progress.finish_stage('extract')
+    progress.finish_stage('analyze')
+    
+    # Generate questions
+    progress.start_stage('generate')
+    if questions is None:
+        with metrics.stage('generate', timings):
+            questions = generator.generate_questions(analysis, requirements, seed)
+        result_cache.put(result_key, questions)
+    progress.finish_stage('generate')
+    
+    # Save questions to file; the name is unique per request so concurrent uploads of
+    # the same file name never overwrite each other
+    progress.start_stage('write')
+    output_filename = unique_name(f"questions_{filename.rsplit('.', 1)[0]}", '.json')
+    
+    with metrics.stage('write', timings):
+        output_store.save(output_filename, questions)
+    progress.finish_stage('write')
+    
+    return {
+        'questions': questions,
+        'seed': seed,
+        'download_url': f'/download/{output_filename}'
+    }
+
+def load_analysis(source, filename, content_hash, requirements, progress, timings=None):
+    """
+    Analysis of the pages of a document the requested paper needs: the
+    requested page ranges, sampled down to a budget sized by the question
+    counts (see page_budget), from the extraction cache or extracted now
+    """
+    extract_timers = []
+    # Pages extracted over all rounds of the page budget
+    extracted_pages = set()
+    
+    def track(segments):
+        # Each extraction round is timed as part of the extract stage
+        timed = metrics.TimedIterator('extract', _track_pages(segments, progress, extracted_pages), timings)
+        extract_timers.append(timed.timer)
+        return timed
+    
+    generator = get_question_generator()
+    progress.start_stage('extract')
+    progress.start_stage('analyze')
+    with metrics.stage('analyze', timings) as analyze_stage:
+        analysis = analyze_within_budget(processor, generator.analyze, source, filename, requirements,
+                                         requirements.get('pages'), app.config['EXTRACTION_SAMPLE_PAGES'] or None,
+                                         track, extraction_cache, content_hash, generator.analysis_options)
+        # Page extraction runs lazily inside analyze(); count it as its own stage
+        for timer in extract_timers:
+            analyze_stage.exclude(timer)
+    if extract_timers:
+        # page_count is the highest page analyzed, which overstates a sample
+        metrics.DOCUMENT_PAGES.observe(len(extracted_pages))
+        metrics.DOCUMENT_TOKENS.observe(len(analysis.tokens))
+    return analysis
+
+def stream_document(source, filename, requirements, seed, timings=None):
+    """
+    Run the pipeline for one uploaded document, yielding events as it goes:
+    'start' with the seed, one 'question' per question as soon as it is
+    generated, then 'done' with the download url (or 'error'). Questions are
+    written to the output file as they are yielded; the finished paper is
+    kept in the result cache (unless it is disabled), like a paper from
+    process_document.
+    """
+    yield {'event': 'start', 'seed': seed}
+    output_filename = unique_name(f"questions_{filename.rsplit('.', 1)[0]}", '.json')
+    try:
+        with metrics.stage('cache_lookup', timings):
+            content_hash = ExtractionCache.hash_file(source)
+            result_key = ResultCache.key(content_hash, requirements, seed)
+            questions = result_cache.get(result_key)
+        # The paper being generated, collected for the result cache
+        paper = None
+        if questions is not None:
+            stream = ((question_type, question) for question_type in QuestionWriter.SECTIONS
+                      for question in questions[question_type])
+        else:
+            analysis = load_analysis(source, filename, content_hash, requirements, Job(), timings)
+            stream = metrics.TimedIterator('generate', get_question_generator().iter_questions(analysis, requirements, seed), timings)
+            if result_cache.max_entries > 0:
+                paper = {question_type: [] for question_type in QuestionWriter.SECTIONS}
+        
+        with output_store.writer(output_filename) as writer:
+            for question_type, question in stream:
+                writer.write(question_type, question)
+                if paper is not None:
+                    paper[question_type].append(question)
+                yield {'event': 'question', 'type': question_type, 'question': question}
+        # Only a paper streamed to the end is complete
+        if paper is not None:
+            result_cache.put(result_key, paper)
+    except Exception as e:
+        yield {'event': 'error', 'error': f'Error processing file: {str(e)}'}
+        return
+    
+    yield {'event': 'done', 'seed': seed, 'download_url': f'/download/{output_filename}'}
+
+def _format_events(events, sse=False):
+    """Serialize stream_document events as NDJSON lines or Server-Sent Events"""
+    for event in events:
+        data = json.dumps(event, ensure_ascii=False)
+        yield f"event: {event['event']}\ndata: {data}\n\n" if sse else f"{data}\n"
+
+def _copy_upload(file):
+    """
+    Private copy of an uploaded file for work that outlives the request
+    handler; the request's own stream is closed once the response is returned
+    """
+    upload = tempfile.SpooledTemporaryFile(max_size=app.config['UPLOAD_SPOOL_THRESHOLD'],
+                                           dir=app.config['UPLOAD_FOLDER'])
+    shutil.copyfileobj(file.stream, upload)
+    return upload
+
+def _track_pages(segments, job, pages):
+    """
+    Pass extracted segments through while adding their page numbers to pages
+    and reporting how many pages have been extracted on the job. With page
+    ranges or a page budget the page numbers have gaps, so they are counted
+    rather than taken as the number of pages read.
+    """
+    for segment in segments:
+        if segment[2] not in pages:
+            pages.add(segment[2])
+            job.update_stage('extract', pages=len(pages))
+        yield segment
+
 @app.route('/')
 def index():
     return render_template('index.html')
@@ -36,73 +287,228 @@ def upload_file():
         return jsonify({'error': 'No file selected'}), 400
     
     if file and allowed_file(file.filename):
-        filename = secure_filename(file.filename)
-        filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-        file.save(filepath)
-        
         # Get question requirements from form
-        requirements = {
-            'mcq_count': int(request.form.get('mcq_count', 5)),
-            'short_answer_count': int(request.form.get('short_answer_count', 3)),
-            'long_answer_count': int(request.form.get('long_answer_count', 2)),
-            'difficulty': request.form.get('difficulty', 'medium')
-        }
-        
         try:
-            # Process document
-            processor = DocumentProcessor()
-            content = processor.extract_text(filepath)
+            requirements = read_requirements(request.form)
+            seed = read_seed(request.form)
+        except ValueError as e:
+            return jsonify({'error': f'Invalid requirements: {str(e)}'}), 400
+        
+        # The upload is processed straight from its (spooled) request stream, never saved by name
+        filename = secure_filename(file.filename)
+        
+        # Send each question as soon as it is generated, as NDJSON or Server-Sent Events
+        stream_format = request.values.get('stream', '').lower()
+        if stream_format in ('1', 'true', 'yes', 'ndjson', 'sse'):
+            sse = stream_format == 'sse'
+            upload = _copy_upload(file)
+            
+            def events():
+                try:
+                    yield from _format_events(stream_document(upload, filename, requirements, seed, g.stage_timings), sse)
+                finally:
+                    upload.close()
             
-            # Generate questions
-            generator = QuestionGenerator()
-            questions = generator.generate_questions(content, requirements)
+            return Response(stream_with_context(events()),
+                            mimetype='text/event-stream' if sse else 'application/x-ndjson',
+                            headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+        
+        # Queue the work and return a job id right away
+        if request.values.get('async', '').lower() in ('1', 'true', 'yes'):
+            upload = _copy_upload(file)
             
-            # Save questions to file
-            output_filename = f"questions_{filename.rsplit('.', 1)[0]}.json"
-            output_path = os.path.join(app.config['OUTPUT_FOLDER'], output_filename)
+            def run_job(job):
+                try:
+                    return process_document(upload, filename, requirements, seed, job)
+                finally:
+                    upload.close()
             
-            with open(output_path, 'w', encoding='utf-8') as f:
-                json.dump(questions, f, indent=2, ensure_ascii=False)
+            try:
+                job = job_queue.submit(run_job)
+            except QueueFullError as e:
+                upload.close()
+                return jsonify({'error': str(e)}), 429
             
             return jsonify({
                 'success': True,
-                'questions': questions,
-                'download_url': f'/download/{output_filename}'
-            })
+                'seed': seed,
+                'job_id': job.id,
+                'status_url': f'/jobs/{job.id}',
+                'result_url': f'/jobs/{job.id}/result'
+            }), 202
+        
+        try:
+            result = process_document(file.stream, filename, requirements, seed, timings=g.stage_timings)
+            return jsonify({'success': True, **result})
             
         except Exception as e:
             return jsonify({'error': f'Error processing file: {str(e)}'}), 500
     
     return jsonify({'error': 'Invalid file type'}), 400
 
+@app.route('/batch', methods=['POST'])
+def batch_upload():
+    """
+    Generate questions for many documents (or zip archives of documents) in one request.
+    Form fields set shared requirements; an optional 'requirements' JSON field maps
+    file names to per-file overrides. Returns a zip with one JSON file per document.
+    """
+    files = [file for file in request.files.getlist('files') if file.filename]
+    if not files:
+        return jsonify({'error': 'No files uploaded'}), 400
+    
+    try:
+        requirements = read_requirements(request.form)
+        overrides = json.loads(request.form.get('requirements') or '{}')
+        if not isinstance(overrides, dict):
+            raise ValueError("requirements must be a JSON object")
+        requirements.update(overrides)
+        seed = read_seed(request.form)
+    except ValueError as e:
+        return jsonify({'error': f'Invalid requirements: {str(e)}'}), 400
+    
+    with tempfile.TemporaryDirectory(dir=app.config['UPLOAD_FOLDER']) as work_dir:
+        file_paths = []
+        # Original (unsanitized) names of each saved file, for matching per-file overrides
+        names = {}
+        for file in files:
+            filename = secure_filename(file.filename)
+            if filename.lower().endswith('.zip'):
+                try:
+                    file_paths.extend(BatchProcessor.expand_zip(file.stream, work_dir, names,
+                                                                app.config['BATCH_MAX_ZIP_MEMBERS'],
+                                                                app.config['BATCH_MAX_ZIP_BYTES']))
+                except zipfile.BadZipFile:
+                    return jsonify({'error': f'Invalid zip archive: {filename}'}), 400
+                except ValueError as e:
+                    return jsonify({'error': f'Invalid zip archive: {filename}: {str(e)}'}), 400
+            elif allowed_file(filename):
+                filepath = BatchProcessor.unique_path(work_dir, filename)
+                file.save(filepath)
+                file_paths.append(filepath)
+                names[filepath] = [file.filename]
+        
+        if not file_paths:
+            return jsonify({'error': 'Invalid file type'}), 400
+        
+        try:
+            results = batch_processor.process(file_paths, requirements, seed, names)
+        except ValueError as e:
+            return jsonify({'error': f'Invalid requirements: {str(e)}'}), 400
+    
+    archive = BytesIO()
+    BatchProcessor.write_archive(results, archive)
+    archive.seek(0)
+    response = send_file(archive, as_attachment=True, download_name='questions_batch.zip', mimetype='application/zip')
+    response.headers['X-Seed'] = str(seed)
+    return response
+
+@app.route('/jobs/<job_id>')
+def job_status(job_id):
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify(job.to_dict())
+
+@app.route('/jobs/<job_id>/result')
+def job_result(job_id):
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    if job.status == 'failed':
+        return jsonify({'error': f'Error processing file: {job.error}'}), 500
+    if job.status != 'done':
+        return jsonify(job.to_dict()), 202
+    return jsonify({'success': True, **job.result})
+
 @app.route('/download/<filename>')
 def download_file(filename):
-    file_path = os.path.join(app.config['OUTPUT_FOLDER'], filename)
-    if os.path.exists(file_path):
-        return send_file(file_path, as_attachment=True)
-    return jsonify({'error': 'File not found'}), 404
+    filename = secure_filename(filename)
+    stored = output_store.open(filename)
+    if stored is None:
+        return jsonify({'error': 'File not found'}), 404
+    
+    # Send the stored (compressed) bytes as they are if the client accepts their encoding
+    stream, encoding = stored
+    # The quality is 0 for encodings the client doesn't list or refuses (e.g. "gzip;q=0")
+    if encoding == 'identity' or request.accept_encodings[encoding] > 0:
+        response = send_file(stream, mimetype='application/json', as_attachment=True, download_name=filename)
+        response.content_length = os.fstat(stream.fileno()).st_size
+        if encoding != 'identity':
+            response.headers['Content-Encoding'] = encoding
+    else:
+        reader = output_store.decompress(stream, encoding)
+        
+        def chunks():
+            with reader:
+                yield from iter(lambda: reader.read(64 * 1024), b'')
+        
+        response = Response(chunks(), mimetype='application/json',
+                            headers={'Content-Disposition': f'attachment; filename={filename}'})
+    response.vary.add('Accept-Encoding')
+    return response
+
+EXPORT_MIMETYPES = {
+    'pdf': 'application/pdf',
+    'docx': 'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
+}
 
 @app.route('/export/<filename>')
 def export_questions(filename):
-    file_path = os.path.join(app.config['OUTPUT_FOLDER'], filename)
-    if not os.path.exists(file_path):
+    filename = secure_filename(filename)
+    export_format = request.args.get('format', 'pdf')
+    if export_format not in EXPORT_MIMETYPES:
+        return jsonify({'error': 'Invalid export format'}), 400
+    
+    with metrics.stage('export_load', g.stage_timings):
+        raw = output_store.read(filename)
+    if raw is None:
         return jsonify({'error': 'File not found'}), 404
+    content_hash = hashlib.sha256(raw).hexdigest()
+    etag = f"{content_hash[:32]}-{export_format}"
     
-    with open(file_path, 'r', encoding='utf-8') as f:
-        questions = json.load(f)
+    # The client already has this export; skip rendering entirely
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+        response.set_etag(etag)
+        return response
     
-    export_format = request.args.get('format', 'pdf')
+    from export_utils import render_pdf, render_docx
+    questions = json.loads(raw)
+    render_export = render_pdf if export_format == 'pdf' else render_docx
+    download_name = f"questions_{filename}.{export_format}"
     
-    if export_format == 'pdf':
-        from export_utils import export_to_pdf
-        pdf_path = export_to_pdf(questions, filename)
-        return send_file(pdf_path, as_attachment=True, download_name=f"questions_{filename}.pdf")
-    elif export_format == 'docx':
-        from export_utils import export_to_docx
-        docx_path = export_to_docx(questions, filename)
-        return send_file(docx_path, as_attachment=True, download_name=f"questions_{filename}.docx")
+    question_count = sum(len(questions.get(question_type, [])) for question_type in QuestionWriter.SECTIONS)
+    if question_count > app.config['EXPORT_SPOOL_QUESTIONS']:
+        # Large banks: render once into a file in OUTPUT_FOLDER (left to the retention policy) and
+        # stream it in chunks, so the export is never held in memory
+        def render_file(f):
+            with metrics.stage(f'export_{export_format}', g.stage_timings):
+                render_export(questions, f)
+        
+        export_file = export_cache.open_or_render((content_hash, export_format), render_file)
+        response = send_file(export_file, as_attachment=True, download_name=download_name,
+                             mimetype=EXPORT_MIMETYPES[export_format], etag=etag, conditional=True)
+        response.content_length = os.fstat(export_file.fileno()).st_size
+        return response
+    
+    def render():
+        # Exports are rendered in memory and streamed; nothing is written to OUTPUT_FOLDER
+        buffer = BytesIO()
+        with metrics.stage(f'export_{export_format}', g.stage_timings):
+            render_export(questions, buffer)
+        return buffer.getvalue()
     
-    return jsonify({'error': 'Invalid export format'}), 400
+    data = export_cache.get_or_render((content_hash, export_format), render)
+    return send_file(BytesIO(data), as_attachment=True, download_name=download_name,
+                     mimetype=EXPORT_MIMETYPES[export_format], etag=etag, conditional=True)
+
+@app.route('/metrics')
+def metrics_endpoint():
+    return Response(metrics.REGISTRY.render(), mimetype='text/plain; version=0.0.4')
 
 if __name__ == '__main__':
+    # Development server; use serve.py for concurrent production serving
+    # Load NLTK data and the tagger before serving the first request
+    warmup()
     app.run(debug=True, host='0.0.0.0', port=5000)
@@ -0,0 +1,190 @@
+import os
+import json
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional, Union, BinaryIO
+from werkzeug.utils import secure_filename
+from document_processor import DocumentProcessor, parse_page_ranges
+from question_generator import QuestionGenerator, get_question_generator, new_seed
+from extraction_cache import ExtractionCache
+from page_budget import analyze_within_budget
+from result_cache import ResultCache
+
+DEFAULT_REQUIREMENTS = {
+    'mcq_count': 5,
+    'short_answer_count': 3,
+    'long_answer_count': 2,
+    'difficulty': 'medium',
+    'pages': None  # 0-based (start, end) page ranges from parse_page_ranges, or None for the whole document
+}
+
+SUPPORTED_EXTENSIONS = ('.pdf', '.docx', '.doc')
+
+# Limits on what one zip archive may expand to, so a small upload can't fill the disk
+MAX_ZIP_MEMBERS = 1000
+MAX_ZIP_BYTES = 256 * 1024 * 1024
+
+class BatchProcessor:
+    """
+    Generate questions for many documents concurrently.
+
+    One QuestionGenerator (stopwords and tagger state) and one
+    DocumentProcessor are shared by all worker threads of the batch.
+    """
+
+    def __init__(self, workers: int = 4, generator: Optional[QuestionGenerator] = None,
+                 processor: Optional[DocumentProcessor] = None, cache: Optional[ExtractionCache] = None,
+                 result_cache: Optional[ResultCache] = None, sample_pages: Optional[int] = None):
+        """
+        sample_pages: read only a stratified sample of pages, starting with this
+        many, sized to the requested paper (see page_budget); None reads every page
+        """
+        self.workers = workers
+        self._generator = generator
+        self.processor = processor or DocumentProcessor()
+        self.cache = cache
+        self.result_cache = result_cache
+        self.sample_pages = sample_pages
+
+    @property
+    def generator(self) -> QuestionGenerator:
+        # Resolved lazily so constructing a BatchProcessor doesn't load NLTK data
+        return self._generator or get_question_generator()
+
+    def process(self, file_paths: List[str],
+                requirements: Union[Dict[str, Any], Dict[str, Dict[str, Any]], None] = None,
+                seed: Optional[int] = None, names: Optional[Dict[str, List[str]]] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        Generate questions for every file.
+
+        requirements holds shared settings (mcq_count, difficulty, ...) and may
+        also map file names to per-file overrides; missing keys fall back to
+        DEFAULT_REQUIREMENTS. Overrides are matched on the names given for a
+        path in names (e.g. the uploaded or archived file name, before it was
+        made safe), then on the file's own name. All files use the same seed
+        (a fresh one if not given). Returns {file name: {'questions': ...,
+        'seed': ...}} or {file name: {'error': ...}} for files that failed.
+        """
+        seed = new_seed() if seed is None else seed
+        names = names or {}
+        jobs = [(path, self._requirements_for(names.get(path, []) + [os.path.basename(path)], requirements), seed)
+                for path in file_paths]
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            outcomes = executor.map(lambda job: self._process_one(*job), jobs)
+            return {os.path.basename(path): outcome for (path, _, _), outcome in zip(jobs, outcomes)}
+
+    def _requirements_for(self, names: List[str], requirements: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """Resolve the requirements of one file from shared settings and the overrides of its first matching name"""
+        merged = dict(DEFAULT_REQUIREMENTS)
+        if requirements:
+            merged.update({k: v for k, v in requirements.items() if k in DEFAULT_REQUIREMENTS})
+            overrides = next((requirements[name] for name in names if isinstance(requirements.get(name), dict)), None)
+            if overrides:
+                merged.update(overrides)
+
+        # Overrides come from client JSON, so any value may have the wrong type
+        for key in ('mcq_count', 'short_answer_count', 'long_answer_count'):
+            if isinstance(merged[key], bool) or not isinstance(merged[key], (int, str)):
+                raise ValueError(f"{key} must be a number")
+            merged[key] = int(merged[key])
+        if not isinstance(merged['difficulty'], str):
+            raise ValueError("difficulty must be a string")
+        # Per-file overrides give page ranges as in the upload form, e.g. "1-10,15"
+        if isinstance(merged['pages'], str):
+            merged['pages'] = parse_page_ranges(merged['pages'])
+        elif merged['pages'] is not None and not isinstance(merged['pages'], list):
+            raise ValueError("pages must be a string of page ranges")
+        return merged
+
+    def _process_one(self, file_path: str, requirements: Dict[str, Any], seed: int) -> Dict[str, Any]:
+        try:
+            content_hash = ExtractionCache.hash_file(file_path) if self.cache or self.result_cache else None
+            result_key = ResultCache.key(content_hash, requirements, seed) if self.result_cache else None
+            questions = self.result_cache.get(result_key) if self.result_cache else None
+            if questions is not None:
+                return {'questions': questions, 'seed': seed}
+
+            generator = self.generator
+            analysis = analyze_within_budget(self.processor, generator.analyze, file_path, None, requirements,
+                                             requirements.get('pages'), self.sample_pages,
+                                             cache=self.cache, content_hash=content_hash,
+                                             options=generator.analysis_options)
+
+            questions = generator.generate_questions(analysis, requirements, seed)
+            if self.result_cache:
+                self.result_cache.put(result_key, questions)
+            return {'questions': questions, 'seed': seed}
+        except Exception as e:
+            return {'error': f'Error processing file: {str(e)}'}
+
+    @staticmethod
+    def expand_zip(zip_file: Union[str, BinaryIO], target_dir: str, names: Optional[Dict[str, List[str]]] = None,
+                   max_members: int = MAX_ZIP_MEMBERS, max_bytes: int = MAX_ZIP_BYTES) -> List[str]:
+        """
+        Extract the supported documents of a zip archive and return their paths.
+        If given, names maps each path to the member's name in the archive (with
+        and without its folders). Raises ValueError if the archive has more than
+        max_members documents or they expand to more than max_bytes; sizes are
+        checked against the archive's headers before extracting and against the
+        bytes actually written while extracting.
+        """
+        paths = []
+        remaining = max_bytes
+        with zipfile.ZipFile(zip_file) as archive:
+            for member in archive.infolist():
+                name = secure_filename(os.path.basename(member.filename))
+                if member.is_dir() or not name.lower().endswith(SUPPORTED_EXTENSIONS):
+                    continue
+                if len(paths) >= max_members:
+                    raise ValueError(f"Zip archive has more than {max_members} documents")
+                if member.file_size > remaining:
+                    raise ValueError(f"Zip archive expands to more than {max_bytes} bytes")
+                path = BatchProcessor.unique_path(target_dir, name)
+                paths.append(path)
+                with archive.open(member) as src, open(path, 'wb') as dst:
+                    while True:
+                        block = src.read(1024 * 1024)
+                        if not block:
+                            break
+                        remaining -= len(block)
+                        if remaining < 0:
+                            raise ValueError(f"Zip archive expands to more than {max_bytes} bytes")
+                        dst.write(block)
+                if names is not None:
+                    names[path] = [member.filename, os.path.basename(member.filename)]
+        return paths
+
+    @staticmethod
+    def unique_path(target_dir: str, name: str) -> str:
+        """Get a path for name in target_dir that does not clash with an existing file"""
+        stem, ext = os.path.splitext(name)
+        path = os.path.join(target_dir, name)
+        counter = 1
+        while os.path.exists(path):
+            path = os.path.join(target_dir, f"{stem}_{counter}{ext}")
+            counter += 1
+        return path
+
+    @staticmethod
+    def write_archive(results: Dict[str, Dict[str, Any]], output: Union[str, BinaryIO]):
+        """
+        Write one questions_<name>.json per document, plus errors.json for
+        failures, into a zip. Entries are named after the full file name, so
+        ch1.pdf and ch1.docx don't collide.
+        """
+        errors = {}
+        with zipfile.ZipFile(output, 'w', zipfile.ZIP_DEFLATED) as archive:
+            for name, result in results.items():
+                if 'error' in result:
+                    errors[name] = result['error']
+                    continue
+                archive.writestr(f"questions_{name}.json",
+                                 json.dumps(result['questions'], indent=2, ensure_ascii=False))
+            if errors:
+                archive.writestr('errors.json', json.dumps(errors, indent=2, ensure_ascii=False))
+
+def generate_batch(file_paths: List[str], requirements: Optional[Dict[str, Any]] = None, workers: int = 4,
+                   seed: Optional[int] = None) -> Dict[str, Dict[str, Any]]:
+    """Generate questions for many documents with a shared generator"""
+    return BatchProcessor(workers=workers).process(file_paths, requirements, seed)
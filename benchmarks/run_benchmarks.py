@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for the Question Answer Generator
+
+Generates synthetic PDF/DOCX fixtures of scaled sizes, then times and
+memory-profiles each stage of the pipeline: text extraction, cleaning,
+NLP analysis, question generation and PDF/Word export. Results are written
+as JSON; with --baseline the run fails when a benchmark regresses.
+
+Examples:
+    python benchmarks/run_benchmarks.py --sizes 10 100 --output results.json
+    python benchmarks/run_benchmarks.py --baseline benchmarks/baseline.json --tolerance 0.25
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import platform
+import argparse
+import tempfile
+import tracemalloc
+import statistics
+from typing import Callable, Dict, Any, List
+import PyPDF2
+from docx import Document
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.platypus import SimpleDocTemplate, Paragraph, PageBreak
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from document_processor import DocumentProcessor
+from question_generator import get_question_generator
+from export_utils import export_to_pdf, export_to_docx
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+TOPICS = ['photosynthesis', 'thermodynamics', 'neural networks', 'statistical inference', 'cell biology',
+          'electromagnetism', 'organic chemistry', 'machine learning', 'plate tectonics', 'macroeconomics']
+WORDS = ['energy', 'system', 'process', 'model', 'structure', 'analysis', 'function', 'theory', 'experiment',
+         'variable', 'principle', 'method', 'reaction', 'network', 'distribution', 'equilibrium', 'signal']
+
+def _paragraph(rng: random.Random) -> str:
+    """Build a paragraph of plausible textbook sentences"""
+    sentences = []
+    for _ in range(rng.randint(4, 7)):
+        topic = rng.choice(TOPICS)
+        words = rng.sample(WORDS, 4)
+        sentences.append(f"The study of {topic} explains how the {words[0]} of a {words[1]} affects its "
+                         f"{words[2]}, and researchers use {words[3]} measurements to test this idea.")
+    return ' '.join(sentences)
+
+def build_fixtures(pages: int) -> Dict[str, str]:
+    """Create (or reuse) a PDF and a DOCX of roughly the given number of pages"""
+    os.makedirs(FIXTURE_DIR, exist_ok=True)
+    pdf_path = os.path.join(FIXTURE_DIR, f'synthetic_{pages}.pdf')
+    docx_path = os.path.join(FIXTURE_DIR, f'synthetic_{pages}.docx')
+
+    # Same seed for the same size, so fixtures are reproducible across machines
+    rng = random.Random(pages)
+    chapters = [(f"Chapter {i + 1}: {rng.choice(TOPICS).title()}", [_paragraph(rng) for _ in range(4)])
+                for i in range(pages)]
+
+    if not os.path.exists(pdf_path):
+        styles = getSampleStyleSheet()
+        story = []
+        for heading, paragraphs in chapters:
+            story.append(Paragraph(heading, styles['Heading1']))
+            story.extend(Paragraph(p, styles['Normal']) for p in paragraphs)
+            story.append(PageBreak())
+        SimpleDocTemplate(pdf_path, pagesize=A4).build(story)
+
+    if not os.path.exists(docx_path):
+        doc = Document()
+        for heading, paragraphs in chapters:
+            doc.add_heading(heading, level=1)
+            for p in paragraphs:
+                doc.add_paragraph(p)
+            doc.add_page_break()
+        doc.save(docx_path)
+
+    return {'pdf': pdf_path, 'docx': docx_path}
+
+def _raw_pdf_text(path: str) -> str:
+    """Uncleaned PDF text, as input for the cleaning benchmark"""
+    with open(path, 'rb') as file:
+        return "\n".join(page.extract_text() or "" for page in PyPDF2.PdfReader(file).pages)
+
+def measure(func: Callable, repeat: int) -> Dict[str, Any]:
+    """Time func over several runs, then measure its peak allocation in one traced run"""
+    timings = []
+    cpu_timings = []
+    for _ in range(repeat):
+        start, cpu_start = time.perf_counter(), time.process_time()
+        func()
+        timings.append(time.perf_counter() - start)
+        cpu_timings.append(time.process_time() - cpu_start)
+
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'median_s': round(statistics.median(timings), 6),
+        'min_s': round(min(timings), 6),
+        'cpu_s': round(statistics.median(cpu_timings), 6),
+        'peak_bytes': peak,
+        'runs': repeat
+    }
+
+def run_suite(sizes: List[int], question_counts: List[int], repeat: int, only: List[str]) -> Dict[str, Any]:
+    processor = DocumentProcessor()
+    docx_processor = DocumentProcessor(word_engine='python-docx')
+    generator = get_question_generator()
+    results = {}
+
+    def bench(name: str, func: Callable):
+        if only and not any(name.startswith(prefix) for prefix in only):
+            return
+        print(f"  {name} ...", file=sys.stderr, flush=True)
+        try:
+            results[name] = measure(func, repeat)
+        except Exception as e:
+            results[name] = {'error': str(e)}
+
+    for pages in sizes:
+        fixtures = build_fixtures(pages)
+        raw_text = _raw_pdf_text(fixtures['pdf'])
+
+        bench(f'extract_text.pdf.{pages}p', lambda: processor.extract_text(fixtures['pdf']))
+        bench(f'extract_text.docx.{pages}p', lambda: processor.extract_text(fixtures['docx']))
+        bench(f'extract_text.docx-python-docx.{pages}p', lambda: docx_processor.extract_text(fixtures['docx']))
+        bench(f'clean_text.{pages}p', lambda: processor._clean_text(raw_text))
+        bench(f'analyze.{pages}p', lambda: generator.analyze(processor.iter_segments(fixtures['pdf'])))
+
+        analysis = generator.analyze(processor.iter_segments(fixtures['pdf']))
+        for count in question_counts:
+            requirements = {'mcq_count': count, 'short_answer_count': count, 'long_answer_count': count,
+                            'difficulty': 'medium'}
+            bench(f'generate_questions.{pages}p.{count}q', lambda: generator.generate_questions(analysis, requirements))
+
+    # Export cost depends on the size of the question set, not the document
+    analysis = generator.analyze(processor.iter_segments(build_fixtures(min(sizes))['pdf']))
+    for count in question_counts:
+        questions = generator.generate_questions(analysis, {'mcq_count': count, 'short_answer_count': count,
+                                                            'long_answer_count': count, 'difficulty': 'medium'})
+        bench(f'export_to_pdf.{count}q', lambda: export_to_pdf(questions, 'benchmark'))
+        bench(f'export_to_docx.{count}q', lambda: export_to_docx(questions, 'benchmark'))
+
+    return results
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """List the benchmarks that are slower or use more memory than the baseline allows"""
+    regressions = []
+    for name, base in baseline.get('results', {}).items():
+        current = results.get(name)
+        if not current or 'error' in current or 'error' in base:
+            continue
+        for metric in ('median_s', 'peak_bytes'):
+            if base[metric] and current[metric] > base[metric] * (1 + tolerance):
+                regressions.append(f"{name}: {metric} {current[metric]} > baseline {base[metric]} (+{tolerance:.0%})")
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark extraction, analysis, generation and export')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 100, 1000], help='Fixture sizes in pages')
+    parser.add_argument('--questions', type=int, nargs='+', default=[10, 100], help='Questions per type to generate/export')
+    parser.add_argument('--repeat', type=int, default=3, help='Timed runs per benchmark')
+    parser.add_argument('--only', nargs='*', default=[], help='Run only benchmarks whose names start with these prefixes')
+    parser.add_argument('--output', help='Write results JSON here (default: stdout)')
+    parser.add_argument('--baseline', help='Fail if results regress against this results JSON')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='Allowed slowdown/memory growth vs baseline')
+    args = parser.parse_args(argv)
+    output_path = os.path.abspath(args.output) if args.output else None
+    baseline_path = os.path.abspath(args.baseline) if args.baseline else None
+
+    # Exports write to outputs/ relative to the working directory; the scratch directory is removed afterwards
+    original_dir = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix='qa_bench_') as work_dir:
+        os.makedirs(os.path.join(work_dir, 'outputs'))
+        os.chdir(work_dir)
+        try:
+            results = run_suite(args.sizes, args.questions, args.repeat, args.only)
+        finally:
+            os.chdir(original_dir)
+    report = {
+        'meta': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'sizes': args.sizes,
+            'questions': args.questions,
+            'repeat': args.repeat
+        },
+        'results': results
+    }
+
+    output = json.dumps(report, indent=2)
+    if output_path:
+        with open(output_path, 'w', encoding='utf-8') as f:
+            f.write(output)
+    else:
+        print(output)
+
+    failed = [name for name, result in results.items() if 'error' in result]
+    for name in failed:
+        print(f"ERROR {name}: {results[name]['error']}", file=sys.stderr)
+
+    regressions = []
+    if baseline_path:
+        with open(baseline_path, 'r', encoding='utf-8') as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+
+    sys.exit(1 if failed or regressions else 0)
+
+if __name__ == "__main__":
+    main()
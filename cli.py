@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Command-line bulk question generation
+
+Walks files and directories, generates questions for every PDF/Word document
+across a process pool, and streams results to a JSONL file or to one JSON
+file per document. Processed documents are recorded in a checkpoint file so
+an interrupted run can be resumed with --resume.
+
+Example:
+    python cli.py course_packs/ --output questions.jsonl --workers 8 --resume
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from typing import List, Dict, Any, Iterator, Set, Tuple
+from document_processor import DocumentProcessor
+from question_generator import get_question_generator, warmup, new_seed
+from segments import Segment
+
+SUPPORTED_EXTENSIONS = ('.pdf', '.docx', '.doc')
+
+def find_documents(inputs: List[str]) -> Iterator[Tuple[str, str]]:
+    """Yield (path, path relative to its input root) for every supported document"""
+    for root in inputs:
+        if os.path.isfile(root):
+            if root.lower().endswith(SUPPORTED_EXTENSIONS):
+                yield root, os.path.basename(root)
+            continue
+
+        for dir_path, dir_names, file_names in os.walk(root):
+            dir_names.sort()
+            for name in sorted(file_names):
+                if name.lower().endswith(SUPPORTED_EXTENSIONS):
+                    path = os.path.join(dir_path, name)
+                    yield path, os.path.relpath(path, root)
+
+def _init_worker():
+    """Load NLTK data and the tagger once per worker process"""
+    warmup()
+
+def _count_pages(segments: Iterator[Segment], pages: Set[int]) -> Iterator[Segment]:
+    """Pass extracted segments through, adding their page numbers to pages"""
+    for segment in segments:
+        pages.add(segment[2])
+        yield segment
+
+def _process_document(path: str, requirements: Dict[str, Any], seed: int) -> Dict[str, Any]:
+    """Extract and generate questions for one document (runs in a worker process)"""
+    start = time.perf_counter()
+    # Pages are already spread over processes, so each document is extracted serially
+    processor = DocumentProcessor(workers=1)
+    try:
+        # Pages are counted from the extracted segments, so Word documents (paged by
+        # their page breaks) count too and the file isn't opened a second time
+        pages = set()
+        generator = get_question_generator()
+        analysis = generator.analyze(_count_pages(processor.iter_segments(path), pages))
+        questions = generator.generate_questions(analysis, requirements, seed)
+        result = {'source': path, 'pages': len(pages), 'seed': seed, 'questions': questions}
+    except Exception as e:
+        result = {'source': path, 'pages': 0, 'error': f'Error processing file: {str(e)}'}
+    result['seconds'] = round(time.perf_counter() - start, 3)
+    return result
+
+def load_checkpoint(checkpoint_path: str) -> set:
+    """Read the set of already processed document paths"""
+    if not os.path.exists(checkpoint_path):
+        return set()
+    with open(checkpoint_path, 'r', encoding='utf-8') as f:
+        return {line.rstrip('\n') for line in f if line.strip()}
+
+class ResultWriter:
+    """Writes results as they arrive, either to one JSONL file or to one JSON file per document"""
+
+    def __init__(self, output: str, per_file: bool, append: bool):
+        self.output = output
+        self.per_file = per_file
+        if per_file:
+            os.makedirs(output, exist_ok=True)
+            self._jsonl = None
+        else:
+            self._jsonl = open(output, 'a' if append else 'w', encoding='utf-8')
+
+    def write(self, result: Dict[str, Any], relative_path: str):
+        if self._jsonl:
+            self._jsonl.write(json.dumps(result, ensure_ascii=False) + '\n')
+            self._jsonl.flush()
+            return
+
+        rel_dir, name = os.path.split(relative_path)
+        out_dir = os.path.join(self.output, rel_dir)
+        os.makedirs(out_dir, exist_ok=True)
+        out_path = os.path.join(out_dir, f"questions_{os.path.splitext(name)[0]}.json")
+        with open(out_path, 'w', encoding='utf-8') as f:
+            json.dump(result, f, indent=2, ensure_ascii=False)
+
+    def close(self):
+        if self._jsonl:
+            self._jsonl.close()
+
+def report(done: int, failed: int, pages: int, started: float, final: bool = False):
+    elapsed = max(time.perf_counter() - started, 1e-9)
+    label = 'Finished' if final else 'Progress'
+    print(f"{label}: {done} documents ({failed} failed), {pages} pages in {elapsed:.1f}s - "
+          f"{done / elapsed:.2f} docs/sec, {pages / elapsed:.2f} pages/sec", file=sys.stderr)
+
+def run(args) -> int:
+    requirements = {
+        'mcq_count': args.mcq,
+        'short_answer_count': args.short,
+        'long_answer_count': args.long,
+        'difficulty': args.difficulty
+    }
+
+    # Every document uses the same seed, so a run can be reproduced exactly
+    seed = new_seed() if args.seed is None else args.seed
+
+    per_file = args.format == 'files'
+    writer = ResultWriter(args.output, per_file, append=args.resume)
+    if per_file:
+        checkpoint_path = args.checkpoint or os.path.join(args.output, '.checkpoint')
+    else:
+        checkpoint_path = args.checkpoint or f"{args.output}.checkpoint"
+    completed = load_checkpoint(checkpoint_path) if args.resume else set()
+    if completed:
+        print(f"Resuming: skipping {len(completed)} already processed documents", file=sys.stderr)
+
+    documents = ((path, rel) for path, rel in find_documents(args.inputs) if path not in completed)
+    checkpoint = open(checkpoint_path, 'a' if args.resume else 'w', encoding='utf-8')
+
+    done = failed = pages = 0
+    started = time.perf_counter()
+    max_in_flight = args.workers * 4
+
+    try:
+        with ProcessPoolExecutor(max_workers=args.workers, initializer=_init_worker) as executor:
+            in_flight = {}
+            exhausted = False
+            while in_flight or not exhausted:
+                # Keep a bounded number of documents queued so huge directories don't pile up futures
+                while not exhausted and len(in_flight) < max_in_flight:
+                    try:
+                        path, rel = next(documents)
+                    except StopIteration:
+                        exhausted = True
+                        break
+                    in_flight[executor.submit(_process_document, path, requirements, seed)] = (path, rel)
+
+                if not in_flight:
+                    break
+                finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    path, rel = in_flight.pop(future)
+                    result = future.result()
+                    writer.write(result, rel)
+                    checkpoint.write(path + '\n')
+                    checkpoint.flush()
+
+                    done += 1
+                    pages += result['pages']
+                    if 'error' in result:
+                        failed += 1
+                        print(f"Failed: {path}: {result['error']}", file=sys.stderr)
+                    if args.progress_every and done % args.progress_every == 0:
+                        report(done, failed, pages, started)
+    finally:
+        writer.close()
+        checkpoint.close()
+
+    report(done, failed, pages, started, final=True)
+    return 1 if failed else 0
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Generate questions for many documents without the web app')
+    parser.add_argument('inputs', nargs='+', help='Documents or directories to scan recursively')
+    parser.add_argument('-o', '--output', required=True, help='JSONL file, or output directory with --format files')
+    parser.add_argument('--format', choices=['jsonl', 'files'], default='jsonl', help='One JSONL file or one JSON file per document')
+    parser.add_argument('-w', '--workers', type=int, default=os.cpu_count() or 1, help='Worker processes')
+    parser.add_argument('--checkpoint', help='Checkpoint file (default: next to the output)')
+    parser.add_argument('--resume', action='store_true', help='Skip documents listed in the checkpoint and append to the output')
+    parser.add_argument('--mcq', type=int, default=5, help='MCQ questions per document')
+    parser.add_argument('--short', type=int, default=3, help='Short answer questions per document')
+    parser.add_argument('--long', type=int, default=2, help='Long answer questions per document')
+    parser.add_argument('--difficulty', choices=['easy', 'medium', 'hard'], default='medium')
+    parser.add_argument('--seed', type=int, help='Random seed for reproducible questions (default: a fresh seed, recorded per result)')
+    parser.add_argument('--progress-every', type=int, default=50, help='Report throughput every N documents (0 to disable)')
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    sys.exit(run(parse_args(argv)))
+
+if __name__ == "__main__":
+    main()
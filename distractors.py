@@ -0,0 +1,117 @@
+import random
+from typing import Dict, List, Optional
+import numpy as np
+from scipy import sparse
+from document_analysis import DocumentAnalysis
+
+class DistractorIndex:
+    """
+    Per-document nearest-neighbour index of terms for MCQ distractors.
+
+    Each term is represented by its positive PMI co-occurrence with every
+    other term (from the analysis' sentence x term matrix), so terms used in
+    similar contexts are close. Candidates are limited to the best scoring
+    terms of the document; a query returns the most similar candidates of
+    the same kind (noun, adjective or phrase) as the answer. Only the rows
+    of the candidates and of queried answers are computed, never the whole
+    term x term matrix.
+    """
+
+    def __init__(self, analysis: DocumentAnalysis, max_candidates: int = 500):
+        self.analysis = analysis
+        self.kinds = np.array(analysis.term_kinds) if analysis.terms else np.empty(0, dtype='<U1')
+        self._neighbours: Dict[int, List[int]] = {}
+
+        # Sentence x term presence; also by column, so the sentences of a few terms are cheap to take
+        self._presence = sparse.csr_matrix(analysis.term_matrix, dtype=np.float64)
+        self._presence.data[:] = 1
+        self._columns = self._presence.tocsc()
+        self._df = np.asarray(self._presence.sum(axis=0)).ravel()
+
+        # Only the top scoring terms are offered as distractors
+        scores = analysis.term_scores
+        if len(scores) > max_candidates:
+            self.candidates = np.sort(np.argpartition(-scores, max_candidates - 1)[:max_candidates])
+        else:
+            self.candidates = np.arange(len(scores))
+        self.candidate_vectors = self._ppmi(self.candidates)
+
+    def _ppmi(self, term_ids: np.ndarray) -> sparse.csr_matrix:
+        """Row-normalized positive PMI of sentence-level co-occurrence, for the given terms only"""
+        sentences = self._presence.shape[0]
+        cooccurrence = (self._columns[:, term_ids].T @ self._presence).tocoo()
+
+        rows, cols, counts = cooccurrence.row, cooccurrence.col, cooccurrence.data
+        terms = term_ids[rows]
+        pmi = np.log(counts * sentences / (self._df[terms] * self._df[cols])) if len(counts) else counts
+        keep = (pmi > 0) & (terms != cols)
+        vectors = sparse.csr_matrix((pmi[keep], (rows[keep], cols[keep])), shape=cooccurrence.shape)
+
+        norms = np.sqrt(np.asarray(vectors.multiply(vectors).sum(axis=1)).ravel())
+        norms[norms == 0] = 1
+        return sparse.csr_matrix(sparse.diags(1 / norms) @ vectors)
+
+    def neighbours(self, term: str, k: int = 3, exclude: Optional[List[str]] = None) -> List[str]:
+        """The k candidates most similar to a term, of the same kind, skipping excluded terms"""
+        term_id = self.analysis.vocabulary.get(term.lower())
+        if term_id is None:
+            return []
+
+        ranked = self._neighbours.get(term_id)
+        if ranked is None:
+            ranked = self._neighbours[term_id] = self._rank(term_id)
+
+        excluded = {word.lower() for word in exclude or ()}
+        neighbours = []
+        for candidate in ranked:
+            candidate_term = self.analysis.terms[candidate]
+            if candidate_term in excluded:
+                continue
+            neighbours.append(candidate_term)
+            if len(neighbours) == k:
+                break
+        return neighbours
+
+    def _rank(self, term_id: int, limit: int = 20) -> List[int]:
+        """Candidates ordered by cosine similarity to a term (computed once per term)"""
+        similarity = np.asarray((self.candidate_vectors @ self._ppmi(np.array([term_id])).T).todense()).ravel()
+
+        # Same kind only, never the term itself or a phrase containing/contained in it
+        term = f" {self.analysis.terms[term_id]} "
+        valid = (self.kinds[self.candidates] == self.kinds[term_id]) & (similarity > 0)
+        valid &= self.candidates != term_id
+        for i in np.flatnonzero(valid):
+            other = f" {self.analysis.terms[self.candidates[i]]} "
+            if term in other or other in term:
+                valid[i] = False
+        positions = np.flatnonzero(valid)
+
+        if len(positions) > limit:
+            positions = positions[np.argpartition(-similarity[positions], limit - 1)[:limit]]
+        positions = positions[np.argsort(-similarity[positions], kind='stable')]
+        return self.candidates[positions].tolist()
+
+    def distractors(self, correct_answer: str, k: int = 3, sentence_index: Optional[int] = None,
+                    rng: Optional[random.Random] = None) -> List[str]:
+        """
+        Pick k distractors for an answer. Terms occurring in the question
+        sentence itself are skipped, since they may well be correct too;
+        when too few similar terms exist, random key terms fill the gap.
+        """
+        exclude = [correct_answer]
+        if sentence_index is not None:
+            row = self.analysis.term_matrix[sentence_index]
+            exclude.extend(self.analysis.terms[i] for i in row.indices)
+
+        chosen = self.neighbours(correct_answer, k, exclude)
+        if len(chosen) < k:
+            taken = {term.lower() for term in exclude + chosen}
+            others = [term for term in self.analysis.key_terms if term not in taken]
+            # Prefer key terms of the same kind as the answer
+            answer_id = self.analysis.vocabulary.get(correct_answer.lower())
+            if answer_id is not None:
+                same_kind = [term for term in others if self.kinds[self.analysis.vocabulary[term]] == self.kinds[answer_id]]
+                if len(same_kind) >= k - len(chosen):
+                    others = same_kind
+            chosen.extend((rng or random).sample(others, min(k - len(chosen), len(others))))
+        return [term.capitalize() for term in chosen]
@@ -0,0 +1,259 @@
+from array import array
+from bisect import bisect_right
+from typing import List, Dict, Tuple, Set, Iterable, Iterator, Union, Optional
+import numpy as np
+from scipy import sparse
+from nltk.tokenize import sent_tokenize, word_tokenize
+from nltk.tag import pos_tag_sents
+from nltk.tag.api import TaggerI
+from segments import Segment, TextTable, SEGMENT_PARAGRAPH, SEGMENT_HEADING
+from term_scoring import TermScorer
+
+NOUN_TAGS = {'NN', 'NNS', 'NNP', 'NNPS'}
+ADJECTIVE_TAGS = {'JJ', 'JJR', 'JJS'}
+KEY_TERM_TAGS = NOUN_TAGS | ADJECTIVE_TAGS
+
+# Kinds of scored terms: single nouns, single adjectives and multi-word noun phrases
+TERM_NOUN = 'N'
+TERM_ADJECTIVE = 'J'
+TERM_PHRASE = 'P'
+
+SENTENCE_ENDINGS = ('.', '!', '?', ':', ';')
+MAX_CARRY_LENGTH = 1000
+
+# Long-answer chunks: consecutive paragraphs of one section, split at sentence boundaries
+MIN_CHUNK_CHARS = 400
+MAX_CHUNK_CHARS = 1500
+MIN_PARAGRAPH_CHARS = 50
+
+# Term units for IDF: every sentence, or every section (by heading, else by page)
+TERM_UNITS = ('sentence', 'section')
+# Documents with fewer sections than this are scored per sentence
+MIN_SECTIONS = 4
+
+
+class DocumentAnalysis:
+    """
+    Precomputed NLP analysis of a single document.
+
+    Every sentence is tokenized and POS tagged exactly once. Tokens and tags
+    are stored in flat lists, and each sentence keeps a (start, end) span into
+    them, so question generators can look up tags without re-tagging.
+    Sentences are stored back to back in one TextTable buffer; paragraphs
+    (long-answer chunks) and headings refer to sentences by index, so the
+    text of a chunk is a single slice of that buffer.
+
+    The content may be a string, an iterable of text chunks (e.g. pages
+    streamed from DocumentProcessor.iter_text) or an iterable of
+    (text, kind, page) segments from DocumentProcessor.iter_segments; only one
+    chunk is held in memory at a time. Segments carry headings and pages, so
+    paragraphs are grouped into sized chunks that never cross a section, and
+    neither sentences nor chunks continue across pages missing from a sample.
+
+    Key terms (nouns/adjectives) and noun phrases of up to max_ngram words
+    are counted into a sparse sentence x term matrix in the same pass; key
+    terms are the top scoring columns under TF-IDF or BM25 (see TermScorer).
+    """
+
+    def __init__(self, content: Union[str, Iterable[str], Iterable[Segment]], stop_words: Set[str],
+                 max_key_terms: int = 20, tagger: Optional[TaggerI] = None, max_ngram: int = 3,
+                 term_scoring: str = 'bm25', term_unit: str = 'section'):
+        if term_unit not in TERM_UNITS:
+            raise ValueError(f"Unknown term unit: {term_unit}")
+        self.sentences = TextTable(' ')
+        self.tokens: List[str] = []
+        self.pos_tags: List[str] = []
+        self.sentence_spans: List[Tuple[int, int]] = []
+        self.sentence_pages = array('l')
+        self.paragraphs: List[Tuple[int, int]] = []
+        self.headings: List[Tuple[int, str]] = []
+        self.page_count = 0
+        self.terms: List[str] = []
+        self.term_kinds: List[str] = []
+        self.vocabulary: Dict[str, int] = {}
+        self.key_terms: List[str] = []
+        self.max_ngram = max_ngram
+
+        # Sentence x term counts, collected CSR-style while analyzing
+        self._term_ids = array('q')
+        self._term_indptr = array('q', [0])
+
+        # The tagger is only used while analyzing; it is not kept on the (picklable) analysis
+        tag_sents = tagger.tag_sents if tagger else pos_tag_sents
+        self._analyze(content, stop_words, tag_sents)
+        self._score_terms(term_scoring, term_unit, max_key_terms)
+
+    @staticmethod
+    def _segments(content: Union[str, Iterable[str], Iterable[Segment]]) -> Iterator[Segment]:
+        """Normalize the content to segments; each plain text chunk counts as one page"""
+        chunks = [content] if isinstance(content, str) else content
+        for page, chunk in enumerate(chunks):
+            if not isinstance(chunk, str):
+                yield chunk
+                continue
+            for block in chunk.split('\n\n'):
+                block = block.strip()
+                if block:
+                    yield block, SEGMENT_PARAGRAPH, page
+
+    def _analyze(self, content: Union[str, Iterable[str], Iterable[Segment]], stop_words: Set[str], tag_sents):
+        """Split, tokenize and tag the content in a single pass"""
+        # Sentences of the long-answer chunk being built: [first sentence, character count]
+        self._chunk = [0, 0]
+
+        # A sentence cut off at the end of a page is carried over and
+        # completed by the first paragraph of the next page
+        carry, carry_page = '', 0
+        previous_page = None
+        for text, kind, page in self._segments(content):
+            self.page_count = max(self.page_count, page + 1)
+            # Pages may be a sample (see PageBudget): nothing continues across skipped pages
+            page_gap = previous_page is not None and page not in (previous_page, previous_page + 1)
+            previous_page = page
+            if carry and (kind != SEGMENT_PARAGRAPH or page == carry_page or page_gap):
+                self._add_block([carry], carry_page, stop_words, tag_sents)
+                carry = ''
+
+            if kind == SEGMENT_HEADING:
+                # A heading ends the current chunk and opens a new section
+                self._close_chunk()
+                self.headings.append((len(self.sentences), text))
+                continue
+
+            if carry:
+                text, page = f"{carry} {text}", carry_page
+                carry = ''
+            elif self._chunk[1] >= MIN_CHUNK_CHARS or page_gap:
+                # Chunks end at paragraph boundaries once they are long enough
+                self._close_chunk()
+
+            block_sentences = sent_tokenize(text)
+            last = block_sentences[-1] if block_sentences else ''
+            if not last.endswith(SENTENCE_ENDINGS) and len(last) < MAX_CARRY_LENGTH:
+                carry, carry_page = block_sentences.pop(), page
+            self._add_block(block_sentences, page, stop_words, tag_sents)
+
+        if carry:
+            self._add_block([carry], carry_page, stop_words, tag_sents)
+        self._close_chunk()
+        del self._chunk
+
+    def _add_block(self, block_sentences: List[str], page: int, stop_words: Set[str], tag_sents):
+        """Tag the sentences of one paragraph and add them to the current chunk"""
+        if not block_sentences:
+            return
+
+        # Tag all sentences of the paragraph in one tagger call
+        tagged_sentences = tag_sents([word_tokenize(s) for s in block_sentences])
+        for sentence, tagged in zip(block_sentences, tagged_sentences):
+            # Very long paragraphs are split into several chunks at sentence boundaries
+            if self._chunk[1] and self._chunk[1] + len(sentence) > MAX_CHUNK_CHARS:
+                self._close_chunk()
+            self._add_sentence(sentence, tagged, stop_words)
+            self.sentence_pages.append(page)
+            self._chunk[1] += len(sentence) + 1
+
+    def _close_chunk(self):
+        """Record the current chunk as a paragraph, unless it is too short to answer from"""
+        first_sentence, length = self._chunk
+        if length > MIN_PARAGRAPH_CHARS:
+            self.paragraphs.append((first_sentence, len(self.sentences)))
+        self._chunk = [len(self.sentences), 0]
+
+    def _add_sentence(self, sentence: str, tagged: List[Tuple[str, str]], stop_words: Set[str]):
+        """Record one tagged sentence and count its terms into the term matrix"""
+        start = len(self.tokens)
+        for word, pos in tagged:
+            self.tokens.append(word)
+            self.pos_tags.append(pos)
+
+            term = word.lower()
+            if term.isalpha() and term not in stop_words and pos in KEY_TERM_TAGS:
+                self._term_ids.append(self._term_id(term, TERM_NOUN if pos in NOUN_TAGS else TERM_ADJECTIVE))
+
+        # Phrases are only counted as terms, not kept, so cached analyses stay small
+        for phrase in self._find_noun_phrases(tagged):
+            # Multi-word phrases are counted as n-gram terms, keeping the head noun at the end
+            words = phrase.lower().split()[-self.max_ngram:]
+            if len(words) > 1:
+                self._term_ids.append(self._term_id(' '.join(words), TERM_PHRASE))
+        self._term_indptr.append(len(self._term_ids))
+
+        self.sentences.add(sentence)
+        self.sentence_spans.append((start, len(self.tokens)))
+
+    def _term_id(self, term: str, kind: str) -> int:
+        """Get the column of a term, adding it to the vocabulary (with the kind it is first seen as)"""
+        term_id = self.vocabulary.get(term)
+        if term_id is None:
+            term_id = self.vocabulary[term] = len(self.terms)
+            self.terms.append(term)
+            self.term_kinds.append(kind)
+        return term_id
+
+    def _score_terms(self, method: str, unit: str, max_key_terms: int):
+        """Build the sentence x term matrix and pick the top scoring key terms"""
+        term_ids = np.frombuffer(self._term_ids, dtype=np.int64) if self._term_ids else np.empty(0, dtype=np.int64)
+        indptr = np.frombuffer(self._term_indptr, dtype=np.int64)
+        self.term_matrix = sparse.csr_matrix((np.ones(len(term_ids), dtype=np.float32), term_ids, indptr),
+                                             shape=(len(self.sentences), len(self.terms)))
+        # Repeated terms in a sentence become a single count entry
+        self.term_matrix.sum_duplicates()
+        del self._term_ids, self._term_indptr
+
+        groups = self.sentence_sections() if unit == 'section' else None
+        if groups is not None and (not len(groups) or groups.max() + 1 < MIN_SECTIONS):
+            groups = None
+        scorer = TermScorer(self.term_matrix, method, groups)
+        self.term_scores = scorer.term_scores
+        self.key_terms = [self.terms[i] for i in scorer.top_terms(max_key_terms)]
+
+    def _find_noun_phrases(self, tagged: List[Tuple[str, str]]) -> List[str]:
+        """Find candidate noun phrases: adjectives followed by one or more nouns"""
+        phrases = []
+        current = []
+        for word, pos in tagged + [('', '')]:
+            if pos in KEY_TERM_TAGS and word.isalpha():
+                current.append((word, pos))
+                continue
+
+            # Trim trailing adjectives so each phrase ends on a noun
+            while current and current[-1][1] not in NOUN_TAGS:
+                current.pop()
+            if current:
+                phrases.append(' '.join(w for w, _ in current))
+            current = []
+        return phrases
+
+    def sentences_with_terms(self, terms: List[str]) -> List[int]:
+        """Get the ids of all sentences containing any of the given terms"""
+        columns = [self.vocabulary[term] for term in terms if term in self.vocabulary]
+        if not columns:
+            return []
+        rows = self.term_matrix[:, columns].nonzero()[0]
+        return np.unique(rows).tolist()
+
+    def sentence_tags(self, index: int) -> List[Tuple[str, str]]:
+        """Get the (word, POS) pairs of a sentence"""
+        start, end = self.sentence_spans[index]
+        return list(zip(self.tokens[start:end], self.pos_tags[start:end]))
+
+    def paragraph_text(self, index: int) -> str:
+        """Get the text of a paragraph"""
+        first, end = self.paragraphs[index]
+        return self.sentences.span(first, end)
+
+    def section_heading(self, sentence_index: int) -> Optional[str]:
+        """Get the heading of the section containing a sentence, if any"""
+        position = bisect_right(self.headings, (sentence_index, '\uffff'))
+        return self.headings[position - 1][1] if position else None
+
+    def sentence_sections(self) -> np.ndarray:
+        """Section number of every sentence: by heading, or by page when there are no headings"""
+        if self.headings:
+            starts = np.array([first for first, _ in self.headings])
+            sections = np.searchsorted(starts, np.arange(len(self.sentences)), side='right')
+        else:
+            sections = np.array(self.sentence_pages, dtype=np.int64)
+        # Renumber without gaps so every group is a non-empty unit
+        return np.unique(sections, return_inverse=True)[1]
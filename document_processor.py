@@ -1,78 +1,353 @@
 import os
+import multiprocessing
 import PyPDF2
 from docx import Document
 import re
-from typing import str
+import shutil
+import tempfile
+import threading
+from bisect import bisect_right
+from io import BytesIO
+from concurrent.futures import ProcessPoolExecutor
+from typing import BinaryIO, Iterator, List, Optional, Tuple, Union
+from segments import Segment, SEGMENT_PARAGRAPH, SEGMENT_HEADING
+from docx_reader import iter_docx_blocks, read_paragraph
+
+PAGE_NUMBER_LINE = re.compile(r'\s*\d+\s*')
+DISALLOWED_CHARS = re.compile(r'[^\w\s.,!?;:()\-]+')
+SENTENCE_END = ('.', '!', '?')
+
+# A sentence-ending line shorter than this fraction of the page's typical line ends its paragraph
+SHORT_LINE_RATIO = 0.8
+MAX_HEADING_WORDS = 12
+# 0-based pages start..end-1 of a document, as parsed from "1-10,15"
+PageRange = Tuple[int, int]
+# A document: a file path, its bytes, or a binary file-like object (e.g. an upload stream)
+Source = Union[str, bytes, BinaryIO]
+
+# 'stream' parses word/document.xml incrementally; 'python-docx' walks the full object model
+WORD_ENGINES = ('stream', 'python-docx')
+
+# The page pool is started from threaded servers, and forking a threaded process can copy
+# locks held by other threads into the child, so workers come from a forkserver instead
+POOL_START_METHOD = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+
+MINOR_WORDS = {'a', 'an', 'and', 'as', 'at', 'by', 'for', 'from', 'in', 'of', 'on', 'or', 'the', 'to', 'vs', 'with'}
+
+def _extract_pages(file_path: str, page_numbers: List[int]) -> List[List[Tuple[str, int]]]:
+    """
+    Extract and segment the given pages of a PDF (runs in a worker process)
+    """
+    processor = DocumentProcessor(workers=1)
+    with open(file_path, 'rb') as file:
+        pdf_reader = PyPDF2.PdfReader(file)
+        return [processor._segment_page(pdf_reader.pages[i].extract_text() or "") for i in page_numbers]
+
+def parse_page_ranges(spec: str) -> List[PageRange]:
+    """
+    Parse 1-based page ranges like "1-10,15" into sorted, merged 0-based
+    (start, end) ranges. The ranges are not expanded, since the page count
+    of the document isn't known yet (see expand_page_ranges).
+    """
+    ranges = []
+    for part in spec.split(','):
+        part = part.strip()
+        if not part:
+            continue
+        first, _, last = part.partition('-')
+        start, end = int(first), int(last or first)
+        if start < 1 or end < start:
+            raise ValueError(f"Invalid page range: {part}")
+        ranges.append((start - 1, end))
+    if not ranges:
+        raise ValueError(f"No pages in: {spec}")
+    
+    merged = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+def expand_page_ranges(ranges: List[PageRange], page_count: int) -> List[int]:
+    """The sorted 0-based page numbers in the ranges that exist in a document of page_count pages"""
+    return [page for start, end in ranges for page in range(start, min(end, page_count))]
+
+def select_page_ranges(segments: Iterator[Segment], ranges: List[PageRange]) -> Iterator[Segment]:
+    """Segments on pages within the ranges, in order; stops reading after the last range"""
+    starts = [start for start, _ in ranges]
+    last_page = ranges[-1][1] - 1 if ranges else -1
+    for segment in segments:
+        page = segment[2]
+        if page > last_page:
+            break
+        position = bisect_right(starts, page) - 1
+        if position >= 0 and page < ranges[position][1]:
+            yield segment
 
 class DocumentProcessor:
-    def __init__(self):
+    def __init__(self, workers: Optional[int] = None, parallel_page_threshold: int = 50, word_engine: str = 'stream'):
+        """
+        workers: processes used for PDF page extraction (defaults to the CPU count);
+            one pool is started on first use and shared by every document and
+            thread using this processor, until close()
+        parallel_page_threshold: PDFs with fewer pages than this are extracted serially
+        word_engine: Word extractor, one of WORD_ENGINES
+        """
+        if word_engine not in WORD_ENGINES:
+            raise ValueError(f"Unknown Word engine: {word_engine}")
         self.supported_formats = ['.pdf', '.docx', '.doc']
+        self.workers = workers or os.cpu_count() or 1
+        self.parallel_page_threshold = parallel_page_threshold
+        self.word_engine = word_engine
+        self._executor = None
+        self._executor_lock = threading.Lock()
+    
+    def close(self):
+        """Shut down the page extraction pool, if it was started"""
+        with self._executor_lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown()
     
-    def extract_text(self, file_path: str) -> str:
+    def _pool(self) -> ProcessPoolExecutor:
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.workers,
+                                                     mp_context=multiprocessing.get_context(POOL_START_METHOD))
+            return self._executor
+    
+    def extract_text(self, source: Source, filename: Optional[str] = None) -> str:
         """
         Extract text from PDF or Word document
         """
-        file_extension = os.path.splitext(file_path)[1].lower()
+        return "\n".join(self.iter_text(source, filename))
+    
+    def iter_text(self, source: Source, filename: Optional[str] = None) -> Iterator[str]:
+        """
+        Extract cleaned text incrementally: one page at a time for PDFs,
+        one block of paragraphs at a time for Word documents
+        """
+        return self._join_pages(self.iter_segments(source, filename))
+    
+    def iter_segments(self, source: Source, filename: Optional[str] = None,
+                      pages: Optional[List[int]] = None) -> Iterator[Segment]:
+        """
+        Extract cleaned (text, kind, page) segments incrementally, in document order.
+        kind is SEGMENT_PARAGRAPH or SEGMENT_HEADING.
+        source is a path, bytes or a binary stream; for bytes and streams the
+        format is taken from filename. pages restricts extraction to the given
+        sorted 0-based page numbers; only those PDF pages are read at all.
+        """
+        name = source if isinstance(source, str) else filename or ''
+        file_extension = os.path.splitext(name)[1].lower()
+        if isinstance(source, bytes):
+            source = BytesIO(source)
         
         if file_extension == '.pdf':
-            return self._extract_from_pdf(file_path)
+            return self._iter_pdf(source, pages)
         elif file_extension in ['.docx', '.doc']:
-            return self._extract_from_word(file_path)
+            segments = self._iter_word_stream(source) if self.word_engine == 'stream' else self._iter_word(source)
+            # Word pages are only known while reading, so the whole document is parsed
+            return segments if pages is None else select_page_ranges(segments, [(page, page + 1) for page in pages])
         else:
             raise ValueError(f"Unsupported file format: {file_extension}")
     
-    def _extract_from_pdf(self, file_path: str) -> str:
+    def count_pages(self, source: Source, filename: Optional[str] = None) -> Optional[int]:
         """
-        Extract text from PDF file
+        Number of pages of a PDF, read from its page tree without extracting text.
+        None for Word documents, whose pages are only known after reading them.
         """
-        text = ""
+        name = source if isinstance(source, str) else filename or ''
+        if os.path.splitext(name)[1].lower() != '.pdf':
+            return None
+        if isinstance(source, bytes):
+            source = BytesIO(source)
         try:
-            with open(file_path, 'rb') as file:
-                pdf_reader = PyPDF2.PdfReader(file)
-                for page_num in range(len(pdf_reader.pages)):
-                    page = pdf_reader.pages[page_num]
-                    text += page.extract_text() + "\n"
+            if isinstance(source, str):
+                with open(source, 'rb') as file:
+                    return len(PyPDF2.PdfReader(file).pages)
+            source.seek(0)
+            return len(PyPDF2.PdfReader(source).pages)
         except Exception as e:
             raise Exception(f"Error reading PDF: {str(e)}")
+    
+    def _join_pages(self, segments: Iterator[Segment], block_size: int = 50) -> Iterator[str]:
+        """
+        Join segments into one text chunk per page (at most block_size segments each)
+        """
+        texts = []
+        current_page = None
+        for text, kind, page in segments:
+            if texts and (page != current_page or len(texts) >= block_size):
+                yield "\n\n".join(texts)
+                texts = []
+            texts.append(text)
+            current_page = page
+        if texts:
+            yield "\n\n".join(texts)
+    
+    def _iter_pdf(self, source: Union[str, BinaryIO], pages: Optional[List[int]] = None) -> Iterator[Segment]:
+        """
+        Yield the segments of each (selected) PDF page, from a path or a binary stream
+        """
+        try:
+            if isinstance(source, str):
+                with open(source, 'rb') as file:
+                    yield from self._iter_pdf_pages(file, source, pages)
+            else:
+                source.seek(0)
+                yield from self._iter_pdf_pages(source, None, pages)
+        except Exception as e:
+            raise Exception(f"Error reading PDF: {str(e)}")
+    
+    def _iter_pdf_pages(self, file: BinaryIO, file_path: Optional[str], pages: Optional[List[int]] = None) -> Iterator[Segment]:
+        pdf_reader = PyPDF2.PdfReader(file)
+        page_count = len(pdf_reader.pages)
+        page_numbers = list(range(page_count)) if pages is None else [page for page in pages if page < page_count]
         
-        return self._clean_text(text)
+        if self.workers > 1 and len(page_numbers) >= self.parallel_page_threshold:
+            # Worker processes open the PDF by path, so only large in-memory PDFs touch the disk
+            spooled_path = None if file_path else self._spool_to_disk(file)
+            try:
+                extracted = self._iter_pdf_parallel(file_path or spooled_path, page_numbers)
+                yield from self._number_pages(extracted, page_numbers)
+            finally:
+                if spooled_path:
+                    os.remove(spooled_path)
+        else:
+            extracted = (self._segment_page(pdf_reader.pages[i].extract_text() or "") for i in page_numbers)
+            yield from self._number_pages(extracted, page_numbers)
+    
+    @staticmethod
+    def _number_pages(pages: Iterator[List[Tuple[str, int]]], page_numbers: List[int]) -> Iterator[Segment]:
+        for page_num, page_segments in zip(page_numbers, pages):
+            for text, kind in page_segments:
+                yield text, kind, page_num
     
-    def _extract_from_word(self, file_path: str) -> str:
+    @staticmethod
+    def _spool_to_disk(stream: BinaryIO) -> str:
+        """Copy a stream to a temporary file and return its path"""
+        stream.seek(0)
+        with tempfile.NamedTemporaryFile(suffix='.pdf', delete=False) as spooled:
+            shutil.copyfileobj(stream, spooled)
+        return spooled.name
+    
+    def _iter_pdf_parallel(self, file_path: str, page_numbers: List[int]) -> Iterator[List[Tuple[str, int]]]:
+        """
+        Extract runs of pages in worker processes and yield the pages back in order
         """
-        Extract text from Word document
+        # Several runs per worker keeps the pool busy when some pages are slower than others
+        run_size = max(1, -(-len(page_numbers) // (self.workers * 4)))
+        runs = [page_numbers[start:start + run_size] for start in range(0, len(page_numbers), run_size)]
+        
+        for pages in self._pool().map(_extract_pages, [file_path] * len(runs), runs):
+            yield from pages
+    
+    def _iter_word(self, source: Union[str, BinaryIO]) -> Iterator[Segment]:
+        """
+        Yield the segments of a Word document (path or binary stream): one per
+        paragraph, headings recognised by their style, pages counted from page breaks
         """
         try:
-            doc = Document(file_path)
-            text = ""
+            if not isinstance(source, str):
+                source.seek(0)
+            doc = Document(source)
+            page = 0
+            after_break = False
             for paragraph in doc.paragraphs:
-                text += paragraph.text + "\n"
+                # Explicit and last-rendered page breaks start a new page, each page counted once
+                _, breaks_before, breaks_after, after_break = read_paragraph(paragraph._element, after_break)
+                page += breaks_before
+                text = self._clean_text(paragraph.text)
+                if text:
+                    style_name = paragraph.style.name if paragraph.style is not None else ''
+                    kind = SEGMENT_HEADING if style_name.startswith(('Heading', 'Title')) else SEGMENT_PARAGRAPH
+                    yield text, kind, page
+                page += breaks_after
             
             # Also extract text from tables
             for table in doc.tables:
                 for row in table.rows:
-                    for cell in row.cells:
-                        text += cell.text + " "
-                    text += "\n"
+                    text = self._clean_text(" ".join(cell.text for cell in row.cells))
+                    if text:
+                        yield text, SEGMENT_PARAGRAPH, page
+        except Exception as e:
+            raise Exception(f"Error reading Word document: {str(e)}")
+    
+    def _iter_word_stream(self, source: Union[str, BinaryIO]) -> Iterator[Segment]:
+        """
+        Yield the segments of a Word document by streaming its XML: paragraphs
+        and table rows in document order, merged table cells read once
+        """
+        try:
+            if not isinstance(source, str):
+                source.seek(0)
+            for text, heading, page in iter_docx_blocks(source):
+                text = self._clean_text(text)
+                if text:
+                    yield text, SEGMENT_HEADING if heading else SEGMENT_PARAGRAPH, page
         except Exception as e:
             raise Exception(f"Error reading Word document: {str(e)}")
-        
-        return self._clean_text(text)
     
     def _clean_text(self, text: str) -> str:
         """
-        Clean and preprocess extracted text
+        Clean and preprocess extracted text in a single scan over its lines:
+        drop page-number lines, strip special characters, collapse whitespace.
+        Paragraph boundaries are kept as '\n\n'.
         """
-        # Remove extra whitespace and normalize
-        text = re.sub(r'\s+', ' ', text)
-        text = re.sub(r'\n+', '\n', text)
-        
-        # Remove special characters but keep punctuation
-        text = re.sub(r'[^\w\s.,!?;:()\-]', '', text)
+        return "\n\n".join(segment for segment, _ in self._segment_page(text))
+    
+    def _segment_page(self, text: str) -> List[Tuple[str, int]]:
+        """
+        Clean one page of text in a single scan over its lines and split it
+        into (text, kind) headings and paragraphs. A paragraph ends at a blank
+        line, or at a short line ending a sentence (the layout gap before a
+        new paragraph); a short title-cased line on its own is a heading.
+        """
+        lines = text.splitlines()
+        lengths = sorted(len(line.strip()) for line in lines if line.strip())
+        typical_length = lengths[len(lengths) * 3 // 4] if lengths else 0
         
-        # Remove page numbers and headers/footers
-        text = re.sub(r'^\d+\s*$', '', text, flags=re.MULTILINE)
+        segments = []
+        words = []
+        for line in lines:
+            # Remove page numbers and headers/footers
+            if PAGE_NUMBER_LINE.fullmatch(line):
+                continue
+            
+            # Remove special characters but keep punctuation, then normalize whitespace
+            line_words = DISALLOWED_CHARS.sub('', line).split()
+            if not line_words:
+                if words:
+                    segments.append((' '.join(words), SEGMENT_PARAGRAPH))
+                    words = []
+                continue
+            
+            if not words and self._is_heading(line_words):
+                segments.append((' '.join(line_words), SEGMENT_HEADING))
+                continue
+            
+            words.extend(line_words)
+            if line_words[-1].endswith(SENTENCE_END) and len(line.strip()) < SHORT_LINE_RATIO * typical_length:
+                segments.append((' '.join(words), SEGMENT_PARAGRAPH))
+                words = []
         
-        return text.strip()
+        if words:
+            segments.append((' '.join(words), SEGMENT_PARAGRAPH))
+        return segments
+    
+    def _is_heading(self, words: List[str]) -> bool:
+        """
+        A heading is a short line without closing punctuation whose words are all
+        capitalized or numbered (minor words like 'of' and 'the' excepted)
+        """
+        if len(words) > MAX_HEADING_WORDS or words[-1][-1] in '.,;!?':
+            return False
+        if not (words[0][0].isupper() or words[0][0].isdigit()):
+            return False
+        return all(word[0].isupper() or word[0].isdigit() or word.lower() in MINOR_WORDS for word in words)
     
     def get_document_info(self, file_path: str) -> dict:
         """
@@ -80,9 +355,17 @@ class DocumentProcessor:
         """
         file_size = os.path.getsize(file_path)
         file_name = os.path.basename(file_path)
+        file_extension = os.path.splitext(file_path)[1].lower()
+        
+        # Only PDFs have a fixed page count; reading it doesn't extract any text
+        pages = None
+        if file_extension == '.pdf':
+            with open(file_path, 'rb') as file:
+                pages = len(PyPDF2.PdfReader(file).pages)
         
         return {
             'name': file_name,
             'size': file_size,
-            'format': os.path.splitext(file_path)[1].lower()
+            'format': file_extension,
+            'pages': pages
         }
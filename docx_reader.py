@@ -0,0 +1,151 @@
+import zipfile
+from xml.etree import ElementTree
+from typing import BinaryIO, Dict, Iterator, Tuple, Union
+
+W = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+
+BODY = W + 'body'
+PARAGRAPH = W + 'p'
+TABLE = W + 'tbl'
+ROW = W + 'tr'
+CELL = W + 'tc'
+TEXT = W + 't'
+TAB = W + 'tab'
+BREAK = W + 'br'
+CARRIAGE_RETURN = W + 'cr'
+RENDERED_PAGE_BREAK = W + 'lastRenderedPageBreak'
+STYLE_ID = W + 'styleId'
+VALUE = W + 'val'
+TYPE = W + 'type'
+
+# (text, is heading, page) for one paragraph or table row
+Block = Tuple[str, bool, int]
+
+def read_heading_styles(archive: zipfile.ZipFile) -> Dict[str, bool]:
+    """Map each paragraph style id to whether its name marks a heading (Heading n, Title)"""
+    try:
+        styles_xml = archive.open('word/styles.xml')
+    except KeyError:
+        return {}
+
+    headings = {}
+    with styles_xml:
+        for _, element in ElementTree.iterparse(styles_xml):
+            if element.tag == W + 'style':
+                name = element.find(W + 'name')
+                style_name = name.get(VALUE, '') if name is not None else ''
+                headings[element.get(STYLE_ID, '')] = style_name.lower().startswith(('heading', 'title'))
+                element.clear()
+    return headings
+
+def iter_docx_blocks(source: Union[str, BinaryIO]) -> Iterator[Block]:
+    """
+    Stream the paragraphs and table rows of a .docx in document order straight
+    from word/document.xml, without building the python-docx object model.
+
+    Each finished paragraph or row is cleared from the tree, so memory is
+    bounded by one top-level element. A table row yields its cells' text
+    once each: horizontally merged cells are a single w:tc already, and the
+    continuation cells of vertical merges are skipped. Text boxes nested in
+    a paragraph are left out, as in python-docx. Pages are counted from
+    explicit and last-rendered page breaks (see read_paragraph); breaks
+    before the first text of a paragraph put it on the new page, later ones
+    count after it.
+    """
+    with zipfile.ZipFile(source) as archive:
+        headings = read_heading_styles(archive)
+        with archive.open('word/document.xml') as document_xml:
+            yield from _iter_blocks(document_xml, headings)
+
+def _iter_blocks(document_xml: BinaryIO, headings: Dict[str, bool]) -> Iterator[Block]:
+    page = 0
+    depth = 0
+    body = None
+    body_depth = 0
+    paragraph_depth = 0
+    table_depth = 0
+    cell_texts = []
+    row_texts = []
+    after_break = False
+
+    for event, element in ElementTree.iterparse(document_xml, events=('start', 'end')):
+        tag = element.tag
+        if event == 'start':
+            depth += 1
+            if tag == PARAGRAPH:
+                paragraph_depth += 1
+            elif tag == TABLE:
+                table_depth += 1
+            elif tag == BODY:
+                body, body_depth = element, depth
+            continue
+
+        depth -= 1
+        if tag == PARAGRAPH:
+            paragraph_depth -= 1
+            if paragraph_depth == 0:
+                text, breaks_before, breaks_after, after_break = read_paragraph(element, after_break)
+                page += breaks_before
+                if table_depth:
+                    # Cell paragraphs (nested tables included) are joined into their row
+                    if text.strip():
+                        cell_texts.append(text)
+                elif text.strip():
+                    style = element.find(f'{W}pPr/{W}pStyle')
+                    heading = style is not None and headings.get(style.get(VALUE, ''), False)
+                    yield text, heading, page
+                page += breaks_after
+            # Text boxes are paragraphs nested in a paragraph; clearing them leaves them out
+            element.clear()
+        elif tag == CELL and table_depth == 1:
+            # Continuation cells of a vertical merge belong to the cell above
+            merge = element.find(f'{W}tcPr/{W}vMerge')
+            if merge is None or merge.get(VALUE) == 'restart':
+                row_texts.extend(cell_texts)
+            cell_texts = []
+            element.clear()
+        elif tag == ROW and table_depth == 1:
+            if row_texts:
+                yield ' '.join(row_texts), False, page
+            row_texts = []
+            element.clear()
+        elif tag == TABLE:
+            table_depth -= 1
+
+        # Drop finished top-level elements from the body so the tree never grows
+        if body is not None and depth == body_depth:
+            body.clear()
+
+def read_paragraph(paragraph, after_break: bool = False) -> Tuple[str, int, int, bool]:
+    """
+    Read a w:p element: its text as python-docx renders it, the page breaks
+    before its first text and after it, and whether it ends on an explicit
+    page break with no text since. Word writes a w:lastRenderedPageBreak
+    where the page after an explicit break begins, so a rendered break with
+    no text since an explicit one (after_break, carried over from the
+    previous paragraph) is the same page break and isn't counted twice.
+    """
+    parts = []
+    breaks = [0, 0]
+    for element in paragraph.iter():
+        tag = element.tag
+        if tag == TEXT:
+            if element.text:
+                parts.append(element.text)
+                after_break = False
+        elif tag == TAB:
+            parts.append('\t')
+            after_break = False
+        elif tag == BREAK:
+            if element.get(TYPE) == 'page':
+                breaks[bool(parts)] += 1
+                after_break = True
+            else:
+                parts.append('\n')
+        elif tag == CARRIAGE_RETURN:
+            parts.append('\n')
+        elif tag == RENDERED_PAGE_BREAK:
+            if not after_break:
+                breaks[bool(parts)] += 1
+            after_break = False
+    return ''.join(parts), breaks[0], breaks[1], after_break
@@ -0,0 +1,101 @@
+import os
+import threading
+from collections import OrderedDict
+from typing import BinaryIO, Callable, Dict, List, Optional, Tuple, TypeVar
+from output_files import atomic_write
+
+T = TypeVar('T')
+
+class ExportCache:
+    """
+    In-memory LRU cache of rendered PDF/Word exports.
+
+    Rendering is deterministic for a given question paper and format, so the
+    bytes are keyed by (questions content hash, format) and rendered once no
+    matter how often the paper is downloaded. Concurrent requests for the
+    same export wait for a single render instead of each starting their own.
+    Holds at most max_entries exports; the least recently used one is dropped
+    first.
+
+    Exports too large to keep in memory are rendered once into a file in
+    directory instead (open_or_render); those files are left to the
+    directory's retention policy.
+    """
+
+    def __init__(self, max_entries: int = 64, directory: Optional[str] = None):
+        self.max_entries = max_entries
+        self.directory = directory
+        self._entries: 'OrderedDict[Tuple[str, str], bytes]' = OrderedDict()
+        # Render lock of each key being rendered, with the number of threads holding or waiting for it
+        self._rendering: Dict[Tuple[str, str], List] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: Tuple[str, str]) -> Optional[bytes]:
+        with self._lock:
+            data = self._entries.get(key)
+            if data is not None:
+                self._entries.move_to_end(key)
+            return data
+
+    def put(self, key: Tuple[str, str], data: bytes):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = data
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get_or_render(self, key: Tuple[str, str], render: Callable[[], bytes]) -> bytes:
+        """Cached export for key, calling render (once across threads) on a miss"""
+        def render_and_put() -> bytes:
+            data = render()
+            self.put(key, data)
+            return data
+        return self._single_flight(key, lambda: self.get(key), render_and_put)
+
+    def open_or_render(self, key: Tuple[str, str], render: Callable[[BinaryIO], None]) -> BinaryIO:
+        """
+        Export for key as an open file in directory, calling render with the
+        file to write (once across threads) when there is none yet
+        """
+        content_hash, export_format = key
+        path = os.path.join(self.directory, f"export_{content_hash}.{export_format}")
+
+        def open_file() -> Optional[BinaryIO]:
+            try:
+                return open(path, 'rb')
+            except FileNotFoundError:
+                return None
+
+        def render_file() -> BinaryIO:
+            with atomic_write(path, 'wb') as f:
+                render(f)
+            return open(path, 'rb')
+        return self._single_flight(key, open_file, render_file)
+
+    def _single_flight(self, key: Tuple[str, str], lookup: Callable[[], Optional[T]], render: Callable[[], T]) -> T:
+        """lookup(), or on a miss render(), called by one thread at a time per key"""
+        result = lookup()
+        if result is not None:
+            return result
+
+        with self._lock:
+            rendering = self._rendering.setdefault(key, [threading.Lock(), 0])
+            rendering[1] += 1
+        try:
+            with rendering[0]:
+                # Another thread may have finished rendering while we waited
+                result = lookup()
+                if result is None:
+                    result = render()
+                return result
+        finally:
+            with self._lock:
+                # The lock is dropped only when no thread still holds or waits for it
+                rendering[1] -= 1
+                if not rendering[1]:
+                    del self._rendering[key]
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -1,120 +1,162 @@
 import os
 import json
+from typing import BinaryIO, Iterable, Iterator
 from reportlab.lib.pagesizes import letter, A4
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, Flowable
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
 from reportlab.lib import colors
 from docx import Document as DocxDocument
 from docx.shared import Inches
 from docx.enum.text import WD_ALIGN_PARAGRAPH
+from output_files import atomic_write
 
-class ExportUtils:
-    def __init__(self):
-        self.styles = getSampleStyleSheet()
-        self.setup_custom_styles()
-    
-    def setup_custom_styles(self):
-        """Setup custom styles for PDF export"""
-        self.styles.add(ParagraphStyle(
-            name='QuestionStyle',
-            parent=self.styles['Normal'],
-            fontSize=12,
-            spaceAfter=6,
-            leftIndent=20
-        ))
-        
-        self.styles.add(ParagraphStyle(
-            name='AnswerStyle',
-            parent=self.styles['Normal'],
-            fontSize=10,
-            spaceAfter=12,
-            leftIndent=40,
-            textColor=colors.grey
-        ))
-        
-        self.styles.add(ParagraphStyle(
-            name='HeaderStyle',
-            parent=self.styles['Heading1'],
-            fontSize=16,
-            spaceAfter=20,
-            alignment=1  # Center alignment
-        ))
+def build_style_sheet():
+    """Sample style sheet plus the custom styles for PDF export"""
+    styles = getSampleStyleSheet()
+    styles.add(ParagraphStyle(
+        name='QuestionStyle',
+        parent=styles['Normal'],
+        fontSize=12,
+        spaceAfter=6,
+        leftIndent=20
+    ))
+    
+    styles.add(ParagraphStyle(
+        name='AnswerStyle',
+        parent=styles['Normal'],
+        fontSize=10,
+        spaceAfter=12,
+        leftIndent=40,
+        textColor=colors.grey
+    ))
+    
+    styles.add(ParagraphStyle(
+        name='HeaderStyle',
+        parent=styles['Heading1'],
+        fontSize=16,
+        spaceAfter=20,
+        alignment=1  # Center alignment
+    ))
+    return styles
+
+# Built once at import and only ever read, so every export (and thread) shares it
+STYLES = build_style_sheet()
 
-def export_to_pdf(questions: dict, filename: str) -> str:
+def export_to_pdf(questions: dict, filename: str, output_dir: str = 'outputs') -> str:
     """Export questions to PDF format"""
-    export_utils = ExportUtils()
-    
     # Create output filename
     base_name = filename.rsplit('.', 1)[0]
-    output_path = f"outputs/questions_{base_name}.pdf"
+    output_path = os.path.join(output_dir, f"questions_{base_name}.pdf")
+    
+    # Written to a temporary file first so concurrent exports never mix
+    with atomic_write(output_path, 'wb') as f:
+        render_pdf(questions, f)
+    return output_path
+
+class LazyStory(list):
+    """
+    Story list filled from an iterator of flowables while doc.build() consumes it.
+    build() takes flowables off the front and checks len() on every step, so
+    keeping a small look-ahead buffer filled means only buffer_size flowables
+    exist at a time instead of one per question and option.
+    """
     
-    # Create PDF document
-    doc = SimpleDocTemplate(output_path, pagesize=A4)
-    story = []
+    def __init__(self, flowables: Iterable[Flowable], buffer_size: int = 64):
+        super().__init__()
+        self._flowables = iter(flowables)
+        self._buffer_size = buffer_size
+        self._exhausted = False
+        self._fill()
     
+    def _fill(self):
+        while not self._exhausted and super().__len__() < self._buffer_size:
+            try:
+                self.append(next(self._flowables))
+            except StopIteration:
+                self._exhausted = True
+    
+    def __len__(self):
+        self._fill()
+        return super().__len__()
+    
+    def __getitem__(self, index):
+        self._fill()
+        return super().__getitem__(index)
+
+def render_pdf(questions: dict, output: BinaryIO):
+    """Render questions as a PDF into a binary stream"""
+    # Build PDF; flowables are generated as the layout needs them, and invariant
+    # output makes the same questions always render to the same bytes
+    doc = SimpleDocTemplate(output, pagesize=A4, invariant=1, pageCompression=1)
+    doc.build(LazyStory(iter_pdf_story(questions)))
+
+def iter_pdf_story(questions: dict) -> Iterator[Flowable]:
+    """Flowables of the PDF export, one question at a time"""
     # Add title
-    title = Paragraph("Generated Questions", export_utils.styles['HeaderStyle'])
-    story.append(title)
-    story.append(Spacer(1, 20))
+    title = Paragraph("Generated Questions", STYLES['HeaderStyle'])
+    yield title
+    yield Spacer(1, 20)
     
     # Add MCQ questions
     if questions.get('mcq'):
-        story.append(Paragraph("Multiple Choice Questions (1 Mark Each)", export_utils.styles['Heading2']))
-        story.append(Spacer(1, 10))
+        yield Paragraph("Multiple Choice Questions (1 Mark Each)", STYLES['Heading2'])
+        yield Spacer(1, 10)
         
         for i, mcq in enumerate(questions['mcq'], 1):
             # Question
             q_text = f"Q{i}. {mcq['question']}"
-            story.append(Paragraph(q_text, export_utils.styles['QuestionStyle']))
+            yield Paragraph(q_text, STYLES['QuestionStyle'])
             
             # Options
             for j, option in enumerate(mcq['options'], 1):
                 option_text = f"({chr(96+j)}) {option}"
-                story.append(Paragraph(option_text, export_utils.styles['Normal']))
+                yield Paragraph(option_text, STYLES['Normal'])
             
-            story.append(Spacer(1, 10))
+            yield Spacer(1, 10)
     
     # Add Short Answer questions
     if questions.get('short_answer'):
-        story.append(Paragraph("Short Answer Questions (2 Marks Each)", export_utils.styles['Heading2']))
-        story.append(Spacer(1, 10))
+        yield Paragraph("Short Answer Questions (2 Marks Each)", STYLES['Heading2'])
+        yield Spacer(1, 10)
         
         for i, saq in enumerate(questions['short_answer'], 1):
             q_text = f"Q{i}. {saq['question']}"
-            story.append(Paragraph(q_text, export_utils.styles['QuestionStyle']))
-            story.append(Spacer(1, 5))
+            yield Paragraph(q_text, STYLES['QuestionStyle'])
+            yield Spacer(1, 5)
             
             # Sample answer
             answer_text = f"Sample Answer: {saq['sample_answer']}"
-            story.append(Paragraph(answer_text, export_utils.styles['AnswerStyle']))
-            story.append(Spacer(1, 10))
+            yield Paragraph(answer_text, STYLES['AnswerStyle'])
+            yield Spacer(1, 10)
     
     # Add Long Answer questions
     if questions.get('long_answer'):
-        story.append(Paragraph("Long Answer Questions (5 Marks Each)", export_utils.styles['Heading2']))
-        story.append(Spacer(1, 10))
+        yield Paragraph("Long Answer Questions (5 Marks Each)", STYLES['Heading2'])
+        yield Spacer(1, 10)
         
         for i, laq in enumerate(questions['long_answer'], 1):
             q_text = f"Q{i}. {laq['question']}"
-            story.append(Paragraph(q_text, export_utils.styles['QuestionStyle']))
-            story.append(Spacer(1, 5))
+            yield Paragraph(q_text, STYLES['QuestionStyle'])
+            yield Spacer(1, 5)
             
             # Detailed answer
             answer_text = f"Sample Answer: {laq['detailed_answer']}"
-            story.append(Paragraph(answer_text, export_utils.styles['AnswerStyle']))
-            story.append(Spacer(1, 15))
-    
-    # Build PDF
-    doc.build(story)
-    return output_path
+            yield Paragraph(answer_text, STYLES['AnswerStyle'])
+            yield Spacer(1, 15)
 
-def export_to_docx(questions: dict, filename: str) -> str:
+def export_to_docx(questions: dict, filename: str, output_dir: str = 'outputs') -> str:
     """Export questions to Word document format"""
     # Create output filename
     base_name = filename.rsplit('.', 1)[0]
-    output_path = f"outputs/questions_{base_name}.docx"
+    output_path = os.path.join(output_dir, f"questions_{base_name}.docx")
     
+    with atomic_write(output_path, 'wb') as f:
+        render_docx(questions, f)
+    return output_path
+
+def render_docx(questions: dict, output: BinaryIO):
+    """Render questions as a Word document into a binary stream"""
     # Create Word document
     doc = DocxDocument()
     
@@ -165,5 +207,4 @@ def export_to_docx(questions: dict, filename: str) -> str:
             doc.add_paragraph()  # Empty line
     
     # Save document
-    doc.save(output_path)
-    return output_path
+    doc.save(output)
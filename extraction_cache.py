@@ -0,0 +1,121 @@
+import os
+import json
+import hashlib
+import pickle
+import tempfile
+import threading
+from typing import Any, BinaryIO, Dict, List, Optional, Tuple, Union
+from document_analysis import DocumentAnalysis
+
+# Bump when DocumentProcessor/DocumentAnalysis output changes so stale entries are ignored
+CACHE_VERSION = 10
+
+class ExtractionCache:
+    """
+    Disk cache of document analyses keyed by the SHA-256 of the uploaded file.
+
+    Each entry holds the cleaned, sentence-split text together with its
+    tokens, POS tags and key terms, so a repeat upload skips extraction and
+    tagging. Entries are evicted least-recently-used first once the cache
+    grows beyond max_bytes.
+    """
+
+    def __init__(self, cache_dir: str = 'cache', max_bytes: int = 256 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+
+    @staticmethod
+    def hash_file(source: Union[str, bytes, BinaryIO], block_size: int = 1024 * 1024) -> str:
+        """
+        Compute the SHA-256 of a file (path, bytes or binary stream) without
+        reading it into memory at once. Streams are rewound afterwards.
+        """
+        if isinstance(source, bytes):
+            return hashlib.sha256(source).hexdigest()
+        digest = hashlib.sha256()
+        f = open(source, 'rb') if isinstance(source, str) else source
+        try:
+            f.seek(0)
+            for block in iter(lambda: f.read(block_size), b''):
+                digest.update(block)
+        finally:
+            if isinstance(source, str):
+                f.close()
+            else:
+                f.seek(0)
+        return digest.hexdigest()
+
+    @staticmethod
+    def key(content_hash: str, pages: Optional[List[Union[int, Tuple[int, int]]]] = None,
+            options: Optional[Dict[str, Any]] = None) -> str:
+        """
+        Cache key of the analysis of a whole document, or of a selection of its
+        pages (numbers or ranges), made with the given extraction and analysis
+        options (e.g. word_engine, max_key_terms)
+        """
+        key = content_hash
+        if pages is not None:
+            key += '-p' + hashlib.sha256(','.join(map(str, pages)).encode()).hexdigest()[:16]
+        if options:
+            key += '-o' + hashlib.sha256(json.dumps(options, sort_keys=True).encode()).hexdigest()[:16]
+        return key
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.v{CACHE_VERSION}.pickle")
+
+    def get(self, key: str) -> Optional[DocumentAnalysis]:
+        """Load a cached analysis, or None on a miss"""
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                analysis = pickle.load(f)
+            # Touch the entry so eviction sees it as recently used
+            os.utime(path)
+            return analysis
+        except FileNotFoundError:
+            return None
+        except Exception:
+            # Corrupt or incompatible entry: drop it and treat as a miss
+            self._remove(path)
+            return None
+
+    def put(self, key: str, analysis: DocumentAnalysis):
+        """Store an analysis, then evict old entries if over the size limit"""
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump(analysis, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self._path(key))
+        except Exception:
+            self._remove(tmp_path)
+            raise
+        self._evict()
+
+    def _evict(self):
+        """Remove least recently used entries until the cache fits in max_bytes"""
+        with self._lock:
+            entries = []
+            for name in os.listdir(self.cache_dir):
+                if not name.endswith('.pickle'):
+                    continue
+                path = os.path.join(self.cache_dir, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                self._remove(path)
+                total -= size
+
+    def _remove(self, path: str):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
@@ -0,0 +1,25 @@
+"""
+Gunicorn settings for serving across several cores (Linux/macOS):
+
+    gunicorn -c gunicorn.conf.py app:app
+
+Every worker process loads its own copy of the NLTK data and tagger once,
+before it accepts requests. Background jobs (async=true uploads) live in the
+worker that accepted them, so job polling needs a single worker or sticky
+sessions; synchronous uploads, /batch and exports work with any number.
+/metrics counts only the requests of the worker that answers it.
+With PDF_WORKERS above 1, each worker also starts that many page extraction
+processes, so keep QA_WORKERS x PDF_WORKERS within the available cores.
+"""
+
+import os
+from question_generator import warmup
+
+bind = os.environ.get('QA_BIND', '0.0.0.0:5000')
+workers = int(os.environ.get('QA_WORKERS', os.cpu_count() or 1))
+threads = int(os.environ.get('QA_THREADS', 4))
+worker_class = 'gthread'
+timeout = 300  # Large documents can take minutes to process synchronously
+
+def post_worker_init(worker):
+    warmup()
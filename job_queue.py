@@ -0,0 +1,106 @@
+import time
+import uuid
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Callable, Optional
+
+STAGES = ['extract', 'analyze', 'generate', 'write']
+
+class QueueFullError(Exception):
+    """Raised when the job queue has no free slot"""
+
+class Job:
+    """A queued document processing job and its per-stage progress"""
+
+    def __init__(self):
+        self.id = uuid.uuid4().hex
+        self.status = 'queued'
+        self.stages = {stage: {'status': 'pending'} for stage in STAGES}
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.finished_at = None
+        # The worker thread updates stages while request threads read them
+        self._lock = threading.Lock()
+
+    def start_stage(self, stage: str):
+        with self._lock:
+            self.stages[stage]['status'] = 'running'
+
+    def finish_stage(self, stage: str):
+        with self._lock:
+            self.stages[stage]['status'] = 'done'
+
+    def update_stage(self, stage: str, **details):
+        """Record progress counters for a stage (e.g. pages extracted so far)"""
+        with self._lock:
+            self.stages[stage].update(details)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Snapshot of the job, safe to serialize while the job keeps running"""
+        with self._lock:
+            stages = {name: dict(stage) for name, stage in self.stages.items()}
+        done = sum(1 for stage in stages.values() if stage['status'] == 'done')
+        return {
+            'job_id': self.id,
+            'status': self.status,
+            'stages': stages,
+            'progress': done / len(stages),
+            'error': self.error
+        }
+
+class JobQueue:
+    """
+    Bounded pool of worker threads running document processing jobs.
+
+    At most max_pending jobs may be queued or running at once; submit()
+    raises QueueFullError beyond that so callers can apply backpressure.
+    Finished jobs are kept for job_ttl seconds so their results can be polled.
+    """
+
+    def __init__(self, max_workers: int = 2, max_pending: int = 16, job_ttl: int = 3600):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='job')
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._jobs: Dict[str, Job] = {}
+        self._lock = threading.Lock()
+        self.job_ttl = job_ttl
+
+    def submit(self, func: Callable, *args) -> Job:
+        """Queue func(job, *args); its return value becomes the job result"""
+        if not self._slots.acquire(blocking=False):
+            raise QueueFullError("Too many jobs in progress, please retry later")
+
+        job = Job()
+        with self._lock:
+            self._prune()
+            self._jobs[job.id] = job
+
+        try:
+            self._executor.submit(self._run, job, func, args)
+        except Exception:
+            self._slots.release()
+            raise
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def _run(self, job: Job, func: Callable, args: tuple):
+        job.status = 'running'
+        try:
+            job.result = func(job, *args)
+            job.status = 'done'
+        except Exception as e:
+            job.error = str(e)
+            job.status = 'failed'
+        finally:
+            job.finished_at = time.time()
+            self._slots.release()
+
+    def _prune(self):
+        """Forget finished jobs older than job_ttl"""
+        cutoff = time.time() - self.job_ttl
+        expired = [job_id for job_id, job in self._jobs.items() if job.finished_at and job.finished_at < cutoff]
+        for job_id in expired:
+            del self._jobs[job_id]
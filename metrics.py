@@ -0,0 +1,209 @@
+import time
+import threading
+import tracemalloc
+from contextlib import contextmanager
+from typing import Dict, List, Tuple, Iterable, Iterator, Optional
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+BYTES_BUCKETS = tuple(2 ** power for power in range(16, 32, 2))  # 64KB .. 1GB
+COUNT_BUCKETS = (1, 10, 50, 100, 250, 500, 1000, 5000, 10000, 100000, 1000000)
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = '') -> str:
+    pairs = [f'{name}="{value}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+def _format_value(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class Counter:
+    """Monotonically increasing value, optionally split by labels"""
+
+    def __init__(self, name: str, documentation: str, labels: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels):
+        key = tuple(str(labels[name]) for name in self.labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.labels, key)} {_format_value(value)}")
+        return lines
+
+class Histogram:
+    """Distribution of observed values in cumulative buckets, optionally split by labels"""
+
+    def __init__(self, name: str, documentation: str, labels: Tuple[str, ...] = (), buckets: Tuple[float, ...] = DURATION_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[Tuple[str, ...], list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = tuple(str(labels[name]) for name in self.labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                # [per-bucket counts, sum, count]
+                series = self._series[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][i] += 1
+                    break
+            series[1] += value
+            series[2] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for key, (counts, total, count) in sorted(self._series.items()):
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets, counts):
+                    cumulative += bucket_count
+                    labels = _format_labels(self.labels, key, 'le="%s"' % bound)
+                    lines.append(f"{self.name}_bucket{labels} {cumulative}")
+                labels = _format_labels(self.labels, key, 'le="+Inf"')
+                lines.append(f"{self.name}_bucket{labels} {count}")
+                lines.append(f"{self.name}_sum{_format_labels(self.labels, key)} {_format_value(total)}")
+                lines.append(f"{self.name}_count{_format_labels(self.labels, key)} {count}")
+        return lines
+
+class MetricsRegistry:
+    """Holds all metrics and renders them in the Prometheus text format"""
+
+    def __init__(self):
+        self._metrics = []
+
+    def counter(self, name: str, documentation: str, labels: Tuple[str, ...] = ()) -> Counter:
+        metric = Counter(name, documentation, labels)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name: str, documentation: str, labels: Tuple[str, ...] = (), buckets: Tuple[float, ...] = DURATION_BUCKETS) -> Histogram:
+        metric = Histogram(name, documentation, labels, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        if resource is not None:
+            # ru_maxrss is in KB on Linux
+            max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+            lines.extend(["# HELP process_max_rss_bytes Peak resident set size of the process",
+                          "# TYPE process_max_rss_bytes gauge",
+                          f"process_max_rss_bytes {max_rss}"])
+        return '\n'.join(lines) + '\n'
+
+REGISTRY = MetricsRegistry()
+
+STAGE_SECONDS = REGISTRY.histogram('qa_stage_duration_seconds', 'Wall time spent in each pipeline stage', ('stage',))
+STAGE_CPU_SECONDS = REGISTRY.histogram('qa_stage_cpu_seconds', 'CPU time of the handling thread in each pipeline stage', ('stage',))
+STAGE_PEAK_BYTES = REGISTRY.histogram('qa_stage_peak_allocated_bytes', 'Peak Python allocation during each pipeline stage (only with memory tracing)', ('stage',), BYTES_BUCKETS)
+DOCUMENT_PAGES = REGISTRY.histogram('qa_document_pages', 'Pages with text extracted per document (Word pages are counted from page breaks)', buckets=COUNT_BUCKETS)
+DOCUMENT_TOKENS = REGISTRY.histogram('qa_document_tokens', 'Tokens analyzed per document', buckets=COUNT_BUCKETS)
+REQUESTS = REGISTRY.counter('qa_requests_total', 'HTTP requests handled', ('endpoint', 'status'))
+REQUEST_SECONDS = REGISTRY.histogram('qa_request_duration_seconds', 'Wall time of HTTP requests', ('endpoint',))
+
+class StageTimer:
+    """Wall/CPU time of one stage; time spent in a nested stage can be excluded"""
+
+    def __init__(self):
+        self.wall = 0.0
+        self.cpu = 0.0
+
+    def exclude(self, other: 'StageTimer'):
+        self.wall -= other.wall
+        self.cpu -= other.cpu
+
+def _record(name: str, timer: StageTimer, timings: Optional[Dict[str, float]], peak: Optional[int] = None):
+    STAGE_SECONDS.observe(max(timer.wall, 0.0), stage=name)
+    STAGE_CPU_SECONDS.observe(max(timer.cpu, 0.0), stage=name)
+    if peak is not None:
+        STAGE_PEAK_BYTES.observe(peak, stage=name)
+    if timings is not None:
+        timings[name] = timings.get(name, 0.0) + max(timer.wall, 0.0)
+
+# Peak allocation of each open stage of the current thread, from before its nested stages reset the peak
+_open_peaks = threading.local()
+
+@contextmanager
+def stage(name: str, timings: Optional[Dict[str, float]] = None) -> Iterator[StageTimer]:
+    """
+    Measure a pipeline stage. Durations are added to the metrics and, if given,
+    to the per-request timings dict. Peak allocation is only recorded while
+    tracemalloc is tracing, since tracing slows every allocation; the peak is
+    process-wide, so it is approximate when stages run concurrently. A nested
+    stage resets the peak, so the enclosing stage's peak so far is saved first
+    and its own peak is the larger of that and the peak at its end.
+    """
+    timer = StageTimer()
+    tracing = tracemalloc.is_tracing()
+    if tracing:
+        peaks = _open_peaks.__dict__.setdefault('stack', [])
+        if peaks:
+            peaks[-1] = max(peaks[-1], tracemalloc.get_traced_memory()[1])
+        peaks.append(0)
+        tracemalloc.reset_peak()
+    wall_start, cpu_start = time.perf_counter(), time.thread_time()
+    try:
+        yield timer
+    finally:
+        # Time of excluded nested stages was already subtracted from the timer
+        timer.wall += time.perf_counter() - wall_start
+        timer.cpu += time.thread_time() - cpu_start
+        peak = max(peaks.pop(), tracemalloc.get_traced_memory()[1]) if tracing else None
+        _record(name, timer, timings, peak)
+
+class TimedIterator:
+    """
+    Times a lazily consumed stream (e.g. pages pulled by the analyzer) as its own stage.
+    Only the time spent producing items is counted; it is recorded once the stream ends.
+    """
+
+    def __init__(self, name: str, iterable: Iterable, timings: Optional[Dict[str, float]] = None):
+        self.name = name
+        self.timer = StageTimer()
+        self.count = 0
+        self._iterator = iter(iterable)
+        self._timings = timings
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        wall_start, cpu_start = time.perf_counter(), time.thread_time()
+        try:
+            item = next(self._iterator)
+        except StopIteration:
+            self._add(wall_start, cpu_start)
+            _record(self.name, self.timer, self._timings)
+            raise
+        self._add(wall_start, cpu_start)
+        self.count += 1
+        return item
+
+    def _add(self, wall_start: float, cpu_start: float):
+        self.timer.wall += time.perf_counter() - wall_start
+        self.timer.cpu += time.thread_time() - cpu_start
+
+def server_timing_header(timings: Dict[str, float]) -> str:
+    """Format per-request stage timings as a Server-Timing header value"""
+    return ', '.join(f"{name};dur={seconds * 1000:.1f}" for name, seconds in timings.items())
@@ -0,0 +1,75 @@
+import os
+import json
+import uuid
+import tempfile
+from contextlib import contextmanager
+from typing import IO, Any, Callable, Iterator
+
+def unique_name(stem: str, extension: str) -> str:
+    """File name for one request's output, so concurrent uploads of the same file never collide"""
+    return f"{stem}_{uuid.uuid4().hex[:12]}{extension}"
+
+@contextmanager
+def atomic_write(path: str, mode: str = 'w', encoding: str = 'utf-8') -> Iterator[IO]:
+    """
+    Write a file through a temporary file in the same directory that replaces
+    the target only once it is complete, so readers never see a partial file
+    and concurrent writers of the same path don't interleave.
+    """
+    directory = os.path.dirname(path) or '.'
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, mode, encoding=None if 'b' in mode else encoding) as f:
+            yield f
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+class QuestionWriter:
+    """
+    Writes a question paper to a text file one question at a time, in the
+    same layout as json.dump(questions, f, indent=2), so a streamed paper
+    never has to be held in memory. Questions must arrive grouped by type
+    in SECTIONS order; call close() to finish the document. dumps encodes
+    one question as indented JSON (json.dumps with indent=2 by default).
+    """
+
+    SECTIONS = ('mcq', 'short_answer', 'long_answer')
+
+    def __init__(self, f: IO, dumps: Callable[[Any], str] = None):
+        self._f = f
+        self._dumps = dumps or (lambda obj: json.dumps(obj, indent=2, ensure_ascii=False))
+        self._section = -1
+        self._count = 0
+        f.write('{')
+
+    def write(self, question_type: str, question: dict):
+        section = self.SECTIONS.index(question_type)
+        if section < self._section:
+            raise ValueError(f"{question_type} question after {self.SECTIONS[self._section]} questions")
+        while self._section < section:
+            self._next_section()
+        text = self._dumps(question).replace('\n', '\n    ')
+        self._f.write(f"{',' if self._count else ''}\n    {text}")
+        self._count += 1
+
+    def close(self):
+        while self._section < len(self.SECTIONS) - 1:
+            self._next_section()
+        self._end_section()
+        self._f.write('\n}')
+
+    def _next_section(self):
+        if self._section >= 0:
+            self._end_section()
+            self._f.write(',')
+        self._section += 1
+        self._count = 0
+        self._f.write(f"\n  {json.dumps(self.SECTIONS[self._section])}: [")
+
+    def _end_section(self):
+        self._f.write('\n  ]' if self._count else ']')
@@ -0,0 +1,138 @@
+import io
+import os
+import gzip
+import json
+from contextlib import contextmanager
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Tuple
+from output_files import QuestionWriter, atomic_write
+
+try:
+    import orjson
+except ImportError:  # Optional faster encoder; the stdlib one gives the same output
+    orjson = None
+
+try:
+    import zstandard
+except ImportError:  # Optional; without it only gzip and identity are available
+    zstandard = None
+
+# Content-Encoding token -> suffix of the stored file
+ENCODINGS = {'zstd': '.zst', 'gzip': '.gz', 'identity': ''}
+
+def dumps(obj: Any) -> str:
+    """Indented JSON that keeps non-ASCII characters, like json.dumps(indent=2, ensure_ascii=False)"""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode('utf-8')
+    return json.dumps(obj, indent=2, ensure_ascii=False)
+
+def available_encodings() -> List[str]:
+    return [encoding for encoding in ENCODINGS if encoding != 'zstd' or zstandard is not None]
+
+class OutputStore:
+    """
+    Storage of generated question papers as compressed JSON artifacts.
+
+    Papers are serialized one question at a time (QuestionWriter) straight
+    into a compressor and a temporary file that replaces the stored file
+    once complete, so neither the paper nor its JSON text is ever held in
+    memory. A paper named questions_x.json is stored as questions_x.json.gz
+    (or .zst); open() returns the stored bytes with their encoding so HTTP
+    responses can pass them through compressed, and decompress() serves
+    clients that don't accept it. Papers written before compression (plain
+    .json files) are still found.
+
+    Another backend (e.g. object storage) only needs to provide writer(),
+    save(), open(), read() and decompress().
+    """
+
+    def __init__(self, directory: str = 'outputs', encoding: str = 'gzip', level: Optional[int] = None):
+        if encoding not in available_encodings():
+            raise ValueError(f"Unsupported output encoding: {encoding}")
+        self.directory = directory
+        self.encoding = encoding
+        self.level = level
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, name: str, encoding: str) -> str:
+        return os.path.join(self.directory, name + ENCODINGS[encoding])
+
+    @contextmanager
+    def writer(self, name: str) -> Iterator[QuestionWriter]:
+        """Write a paper question by question; it is stored once the block completes"""
+        with atomic_write(self._path(name, self.encoding), 'wb') as f:
+            compressed = self._compressor(f)
+            text = io.TextIOWrapper(compressed, encoding='utf-8')
+            writer = QuestionWriter(text, dumps)
+            yield writer
+            writer.close()
+            text.flush()
+            text.detach()
+            if compressed is not f:
+                compressed.close()
+
+    def save(self, name: str, questions: Dict[str, List[Dict]]):
+        with self.writer(name) as writer:
+            for question_type in QuestionWriter.SECTIONS:
+                for question in questions.get(question_type, []):
+                    writer.write(question_type, question)
+
+    def open(self, name: str) -> Optional[Tuple[BinaryIO, str]]:
+        """The stored file of a paper and its encoding, or None if there is none"""
+        for encoding in [self.encoding] + [encoding for encoding in ENCODINGS if encoding != self.encoding]:
+            try:
+                return open(self._path(name, encoding), 'rb'), encoding
+            except FileNotFoundError:
+                continue
+        return None
+
+    def read(self, name: str) -> Optional[bytes]:
+        """The JSON text of a paper, decompressed, or None if there is none"""
+        stored = self.open(name)
+        if stored is None:
+            return None
+        stream, encoding = stored
+        with self.decompress(stream, encoding) as reader:
+            return reader.read()
+
+    @staticmethod
+    def decompress(stream: BinaryIO, encoding: str) -> BinaryIO:
+        """Reader of the decompressed bytes of a stored file; closing it closes the file"""
+        if encoding == 'gzip':
+            return _ClosingReader(gzip.GzipFile(fileobj=stream, mode='rb'), stream)
+        if encoding == 'zstd':
+            if zstandard is None:
+                raise ValueError("zstandard is not installed")
+            return zstandard.ZstdDecompressor().stream_reader(stream, closefd=True)
+        return stream
+
+    def _compressor(self, f: BinaryIO) -> BinaryIO:
+        if self.encoding == 'gzip':
+            # mtime=0 keeps the output identical for identical papers
+            return gzip.GzipFile(fileobj=f, mode='wb', compresslevel=self.level or 6, mtime=0)
+        if self.encoding == 'zstd':
+            return zstandard.ZstdCompressor(level=self.level or 3).stream_writer(f, closefd=False)
+        return f
+
+class _ClosingReader(io.RawIOBase):
+    """Reads from a decompressor and closes the underlying file with it"""
+
+    def __init__(self, reader: BinaryIO, stream: BinaryIO):
+        self._reader = reader
+        self._stream = stream
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        data = self._reader.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+
+    def read(self, size: int = -1) -> bytes:
+        return self._reader.read(size)
+
+    def close(self):
+        if not self.closed:
+            self._reader.close()
+            self._stream.close()
+        super().close()
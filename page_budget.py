@@ -0,0 +1,131 @@
+import math
+from typing import Any, Callable, Dict, Iterator, List, Optional
+from document_analysis import DocumentAnalysis
+from document_processor import DocumentProcessor, PageRange, Source, expand_page_ranges, select_page_ranges
+from extraction_cache import ExtractionCache
+from segments import Segment
+
+# Candidates wanted per requested question, since not every sentence or chunk yields one
+SENTENCES_PER_QUESTION = 8
+CHUNKS_PER_LONG_ANSWER = 3
+# Pages read in the first round, and documents shorter than this are read in full
+MIN_SAMPLE_PAGES = 10
+
+def stratified_page_order(page_count: int) -> List[int]:
+    """
+    All pages in bit-reversed order (0, n/2, n/4, 3n/4, ...), so every prefix
+    of the order is spread evenly over the document and a sample can be
+    extended just by taking more of it
+    """
+    bits = max(page_count - 1, 0).bit_length()
+    order = (int(format(i, f'0{bits}b')[::-1], 2) if bits else 0 for i in range(1 << bits))
+    return [page for page in order if page < page_count]
+
+def candidate_coverage(analysis: DocumentAnalysis, requirements: Dict[str, Any]) -> float:
+    """
+    Fraction of the wanted candidate sentences/chunks the analysis provides for the
+    requested paper, for the question type that is shortest (1.0 or more is enough)
+    """
+    wanted_and_found = [
+        (requirements['mcq_count'] * SENTENCES_PER_QUESTION,
+         len(analysis.sentences_with_terms(analysis.key_terms)) if requirements['mcq_count'] else 0),
+        (requirements['short_answer_count'] * SENTENCES_PER_QUESTION, len(analysis.sentences)),
+        (requirements['long_answer_count'] * CHUNKS_PER_LONG_ANSWER, len(analysis.paragraphs)),
+    ]
+    return min((found / wanted for wanted, found in wanted_and_found if wanted), default=math.inf)
+
+class PageBudget:
+    """
+    Chooses which pages of a document to read for a question paper.
+
+    A stratified sample of min_pages pages is read first (of the explicit page
+    ranges if given, else of the whole document). While the analysis of the
+    sample has too few candidates for the requested counts, the sample grows
+    in proportion to the shortfall (at least doubling) along the same
+    stratified order. Documents of fewer than min_pages pages, and documents
+    whose page count is unknown (Word), are read in full; min_pages=None
+    disables sampling. Page ranges are clamped to the page count before they
+    are expanded, so "1-1000000000" costs no more than the document's pages.
+    """
+
+    def __init__(self, page_count: Optional[int], requirements: Dict[str, Any],
+                 pages: Optional[List[PageRange]] = None, min_pages: Optional[int] = MIN_SAMPLE_PAGES):
+        self.requirements = requirements
+        if page_count is None:
+            # Word: either the explicit page ranges or everything, in one round
+            self._order = None
+            self.pages = None
+            return
+
+        candidates = list(range(page_count)) if pages is None else expand_page_ranges(pages, page_count)
+        self._order = [candidates[i] for i in stratified_page_order(len(candidates))]
+        self._budget = len(self._order) if min_pages is None else min(len(self._order), max(min_pages, 1))
+        self.pages = sorted(self._order[:self._budget])
+
+    @property
+    def complete(self) -> bool:
+        """Whether every candidate page has been selected"""
+        return self._order is None or self._budget >= len(self._order)
+
+    def extend(self, analysis: DocumentAnalysis) -> Optional[List[int]]:
+        """
+        The next, larger page selection if the analysis of the current one
+        is short of candidates, else None
+        """
+        if self.complete:
+            return None
+        coverage = candidate_coverage(analysis, self.requirements)
+        if coverage >= 1:
+            return None
+
+        growth = 2 if coverage <= 0 else max(2, 1.2 / coverage)
+        self._budget = min(len(self._order), math.ceil(self._budget * growth))
+        self.pages = sorted(self._order[:self._budget])
+        return self.pages
+
+def analyze_within_budget(processor: DocumentProcessor, analyze: Callable[[Iterator[Segment]], DocumentAnalysis],
+                          source: Source, filename: Optional[str], requirements: Dict[str, Any],
+                          pages: Optional[List[PageRange]] = None, min_pages: Optional[int] = MIN_SAMPLE_PAGES,
+                          track: Callable[[Iterator[Segment]], Iterator[Segment]] = lambda segments: segments,
+                          cache: Optional[ExtractionCache] = None, content_hash: Optional[str] = None,
+                          options: Optional[Dict[str, Any]] = None) -> DocumentAnalysis:
+    """
+    Analyze only as many pages as the requested paper needs (see PageBudget).
+    Each page is extracted at most once; every round re-analyzes the
+    selected pages in document order. track wraps each round's extraction
+    stream (e.g. for progress or timing). With a cache and the document's
+    content hash, the analysis of each selection is looked up and stored
+    under ExtractionCache.key, so the same request always sees the same
+    analysis; reading every page is cached as the whole document. options
+    are the analysis options behind analyze (QuestionGenerator.analysis_options)
+    and are part of the key, together with the processor's Word engine.
+    """
+    budget = PageBudget(processor.count_pages(source, filename), requirements, pages, min_pages)
+    cache_options = dict(options or {}, word_engine=processor.word_engine)
+    extracted: Dict[int, List[Segment]] = {}
+    selected = budget.pages
+    while True:
+        whole_document = pages is None and budget.complete
+        # Word documents with explicit ranges are cached by the ranges, since their pages aren't known
+        selection = selected if selected is not None else pages
+        key = ExtractionCache.key(content_hash, None if whole_document else selection, cache_options) if cache else None
+        analysis = cache.get(key) if cache else None
+        if analysis is None:
+            if selected is None or (whole_document and not extracted):
+                # Read in one pass: stream the document straight into the analysis
+                segments = processor.iter_segments(source, filename)
+                if selected is None and pages is not None:
+                    segments = select_page_ranges(segments, pages)
+                analysis = analyze(track(segments))
+            else:
+                new_pages = [page for page in selected if page not in extracted]
+                extracted.update((page, []) for page in new_pages)
+                for segment in track(processor.iter_segments(source, filename, new_pages)):
+                    extracted[segment[2]].append(segment)
+                analysis = analyze(segment for page in selected for segment in extracted[page])
+            if cache:
+                cache.put(key, analysis)
+
+        selected = budget.extend(analysis)
+        if selected is None:
+            return analysis
@@ -1,100 +1,144 @@
-import re
 import random
-from typing import List, Dict, Any
+import threading
+from typing import List, Dict, Any, Tuple, Union, Iterable, Iterator, Optional
 import nltk
-from nltk.tokenize import sent_tokenize, word_tokenize
 from nltk.corpus import stopwords
-from nltk.tag import pos_tag
+from nltk.tag.perceptron import PerceptronTagger
+from document_analysis import DocumentAnalysis, NOUN_TAGS
+from segments import Segment
+from distractors import DistractorIndex
+from question_scheduler import QuestionScheduler
 
-# Download required NLTK data
-try:
-    nltk.data.find('tokenizers/punkt')
-except LookupError:
-    nltk.download('punkt')
+NLTK_RESOURCES = [
+    ('tokenizers/punkt', 'punkt'),
+    ('corpora/stopwords', 'stopwords'),
+    ('taggers/averaged_perceptron_tagger', 'averaged_perceptron_tagger')
+]
 
-try:
-    nltk.data.find('corpora/stopwords')
-except LookupError:
-    nltk.download('stopwords')
+def ensure_nltk_data():
+    """Download required NLTK data if it is missing"""
+    for path, package in NLTK_RESOURCES:
+        try:
+            nltk.data.find(path)
+        except LookupError:
+            nltk.download(package)
 
-try:
-    nltk.data.find('taggers/averaged_perceptron_tagger')
-except LookupError:
-    nltk.download('averaged_perceptron_tagger')
+def nltk_data_available() -> bool:
+    """Whether all required NLTK data is installed"""
+    try:
+        for path, _ in NLTK_RESOURCES:
+            nltk.data.find(path)
+    except LookupError:
+        return False
+    return True
 
 class QuestionGenerator:
-    def __init__(self):
+    def __init__(self, tagger: Optional[PerceptronTagger] = None, max_key_terms: int = 20, max_ngram: int = 3,
+                 term_scoring: str = 'bm25', term_unit: str = 'section'):
+        """
+        max_key_terms: number of top scoring terms kept as key terms
+        max_ngram: longest noun phrase (in words) scored as a single term
+        term_scoring: 'bm25' or 'tfidf'; term_unit: 'section' or 'sentence' (see DocumentAnalysis)
+        """
+        # Cheap once data is installed; servers build a single generator (get_question_generator)
+        ensure_nltk_data()
         self.stop_words = set(stopwords.words('english'))
-        
-    def generate_questions(self, content: str, requirements: Dict[str, Any]) -> Dict[str, List[Dict]]:
+        # Loading the tagger model is expensive, so it is done once and reused for every document
+        self.tagger = tagger or PerceptronTagger()
+        self.analysis_options = {
+            'max_key_terms': max_key_terms,
+            'max_ngram': max_ngram,
+            'term_scoring': term_scoring,
+            'term_unit': term_unit
+        }
+    
+    def analyze(self, content: Union[str, Iterable[str], Iterable[Segment]]) -> DocumentAnalysis:
         """
-        Generate different types of questions based on content and requirements
+        Build the NLP analysis of a document once, so it can be shared by all question generators.
+        Accepts the full text, a stream of text chunks such as DocumentProcessor.iter_text(),
+        or the structured segments from DocumentProcessor.iter_segments().
         """
-        # Split content into sentences and paragraphs
-        sentences = sent_tokenize(content)
-        paragraphs = self._split_into_paragraphs(content)
-        
-        # Extract key concepts and terms
-        key_terms = self._extract_key_terms(content)
+        return DocumentAnalysis(content, self.stop_words, tagger=self.tagger, **self.analysis_options)
         
+    def generate_questions(self, content: Union[str, Iterable[str], Iterable[Segment], DocumentAnalysis], requirements: Dict[str, Any],
+                           seed: Optional[int] = None) -> Dict[str, List[Dict]]:
+        """
+        Generate different types of questions based on content and requirements.
+        The same content, requirements and seed always give the same questions;
+        without a seed every call gives a different paper.
+        """
         questions = {
             'mcq': [],
             'short_answer': [],
             'long_answer': []
         }
+        for question_type, question in self.iter_questions(content, requirements, seed):
+            questions[question_type].append(question)
+        return questions
+    
+    def iter_questions(self, content: Union[str, Iterable[str], Iterable[Segment], DocumentAnalysis], requirements: Dict[str, Any],
+                       seed: Optional[int] = None) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Yield (question type, question) pairs as soon as each question is built:
+        all MCQs, then short answers, then long answers. Gives exactly the
+        questions of generate_questions for the same arguments.
+        """
+        # A private RNG keeps concurrent generations independent of each other and of global state
+        rng = random.Random(seed)
+        
+        # Tokenize and tag the document once; accept a text stream or a precomputed analysis too
+        if isinstance(content, DocumentAnalysis):
+            analysis = content
+        else:
+            analysis = self.analyze(content)
+        
+        # Sentences, paragraphs and concepts are drawn without replacement, spread over sections
+        scheduler = QuestionScheduler(analysis, rng)
+        # Term similarities for distractors are computed once per document
+        distractor_index = DistractorIndex(analysis) if requirements['mcq_count'] else None
+        
+        # Each loop makes at most one pass over its pool; a document too small
+        # for the request yields fewer questions rather than duplicates
         
         # Generate MCQ questions (1 mark)
-        for i in range(requirements['mcq_count']):
-            mcq = self._generate_mcq(sentences, key_terms, requirements['difficulty'])
+        count = 0
+        while analysis.key_terms and count < requirements['mcq_count']:
+            index = scheduler.mcq_sentences.draw()
+            if index is None:
+                break
+            mcq = self._generate_mcq(analysis, index, scheduler, distractor_index, requirements['difficulty'], rng)
             if mcq:
-                questions['mcq'].append(mcq)
+                scheduler.use_sentence(index)
+                count += 1
+                yield 'mcq', mcq
         
         # Generate short answer questions (2 marks)
-        for i in range(requirements['short_answer_count']):
-            short_q = self._generate_short_answer(sentences, paragraphs, requirements['difficulty'])
+        count = 0
+        while count < requirements['short_answer_count']:
+            index = scheduler.short_answer_sentences.draw()
+            if index is None:
+                break
+            short_q = self._generate_short_answer(analysis, index, scheduler, requirements['difficulty'], rng)
             if short_q:
-                questions['short_answer'].append(short_q)
+                scheduler.use_sentence(index)
+                count += 1
+                yield 'short_answer', short_q
         
         # Generate long answer questions (5 marks)
-        for i in range(requirements['long_answer_count']):
-            long_q = self._generate_long_answer(paragraphs, content, requirements['difficulty'])
+        count = 0
+        while count < requirements['long_answer_count']:
+            index = scheduler.paragraphs.draw()
+            if index is None:
+                break
+            long_q = self._generate_long_answer(analysis, index, scheduler, requirements['difficulty'], rng)
             if long_q:
-                questions['long_answer'].append(long_q)
-        
-        return questions
+                count += 1
+                yield 'long_answer', long_q
     
-    def _split_into_paragraphs(self, content: str) -> List[str]:
-        """Split content into meaningful paragraphs"""
-        paragraphs = content.split('\n\n')
-        return [p.strip() for p in paragraphs if len(p.strip()) > 50]
-    
-    def _extract_key_terms(self, content: str) -> List[str]:
-        """Extract important terms and concepts from content"""
-        words = word_tokenize(content.lower())
-        words = [word for word in words if word.isalpha() and word not in self.stop_words]
-        
-        # Get POS tags to identify nouns and adjectives
-        pos_tags = pos_tag(words)
-        key_terms = [word for word, pos in pos_tags if pos in ['NN', 'NNS', 'NNP', 'NNPS', 'JJ', 'JJR', 'JJS']]
-        
-        # Count frequency and return most common terms
-        term_freq = {}
-        for term in key_terms:
-            term_freq[term] = term_freq.get(term, 0) + 1
-        
-        return sorted(term_freq.keys(), key=lambda x: term_freq[x], reverse=True)[:20]
-    
-    def _generate_mcq(self, sentences: List[str], key_terms: List[str], difficulty: str) -> Dict[str, Any]:
+    def _generate_mcq(self, analysis: DocumentAnalysis, index: int, scheduler: QuestionScheduler,
+                      distractor_index: DistractorIndex, difficulty: str, rng: random.Random) -> Dict[str, Any]:
         """Generate Multiple Choice Question"""
-        if not sentences or not key_terms:
-            return None
-        
-        # Select a sentence that contains key terms
-        relevant_sentences = [s for s in sentences if any(term in s.lower() for term in key_terms[:10])]
-        if not relevant_sentences:
-            relevant_sentences = sentences
-        
-        sentence = random.choice(relevant_sentences)
+        sentence = analysis.sentences[index]
         
         # Create question based on sentence
         question_patterns = [
@@ -104,18 +148,18 @@ class QuestionGenerator:
             "Which concept is being described in the given text?"
         ]
         
-        question = random.choice(question_patterns)
+        question = rng.choice(question_patterns)
         
         # Generate options
-        correct_answer = self._extract_key_concept(sentence)
+        correct_answer = self._extract_key_concept(analysis.sentence_tags(index), scheduler, 'mcq')
         if not correct_answer:
             return None
         
         # Generate distractors
-        distractors = self._generate_distractors(key_terms, correct_answer)
+        distractors = self._generate_distractors(distractor_index, correct_answer, index, rng)
         
         options = [correct_answer] + distractors[:3]
-        random.shuffle(options)
+        rng.shuffle(options)
         
         return {
             'question': f"{question}\n\n\"{sentence}\"",
@@ -125,13 +169,10 @@ class QuestionGenerator:
             'difficulty': difficulty
         }
     
-    def _generate_short_answer(self, sentences: List[str], paragraphs: List[str], difficulty: str) -> Dict[str, Any]:
+    def _generate_short_answer(self, analysis: DocumentAnalysis, index: int, scheduler: QuestionScheduler,
+                               difficulty: str, rng: random.Random) -> Dict[str, Any]:
         """Generate Short Answer Question (2 marks)"""
-        if not sentences:
-            return None
-        
-        # Select a sentence for question generation
-        sentence = random.choice(sentences)
+        sentence = analysis.sentences[index]
         
         question_patterns = [
             "Explain briefly:",
@@ -142,11 +183,11 @@ class QuestionGenerator:
         ]
         
         # Extract key concept from sentence
-        key_concept = self._extract_key_concept(sentence)
+        key_concept = self._extract_key_concept(analysis.sentence_tags(index), scheduler, 'short_answer')
         if not key_concept:
             return None
         
-        question = f"{random.choice(question_patterns)} {key_concept}"
+        question = f"{rng.choice(question_patterns)} {key_concept}"
         
         # Generate sample answer
         sample_answer = self._generate_sample_answer(sentence, key_concept)
@@ -158,12 +199,10 @@ class QuestionGenerator:
             'difficulty': difficulty
         }
     
-    def _generate_long_answer(self, paragraphs: List[str], content: str, difficulty: str) -> Dict[str, Any]:
+    def _generate_long_answer(self, analysis: DocumentAnalysis, index: int, scheduler: QuestionScheduler,
+                              difficulty: str, rng: random.Random) -> Dict[str, Any]:
         """Generate Long Answer Question (5 marks)"""
-        if not paragraphs:
-            return None
-        
-        paragraph = random.choice(paragraphs)
+        paragraph = analysis.paragraph_text(index)
         
         question_patterns = [
             "Discuss in detail:",
@@ -173,15 +212,19 @@ class QuestionGenerator:
             "Critically examine:"
         ]
         
-        # Extract main topic from paragraph
-        main_topic = self._extract_main_topic(paragraph)
+        # Extract main topic from the paragraph's first sentence
+        first_sentence = analysis.paragraphs[index][0]
+        main_topic = self._extract_main_topic(analysis.sentence_tags(first_sentence))
         if not main_topic:
+            # Fall back to the title of the section the chunk comes from
+            main_topic = analysis.section_heading(first_sentence)
+        if not main_topic or not scheduler.use_concept('long_answer', main_topic):
             return None
         
-        question = f"{random.choice(question_patterns)} {main_topic}"
+        question = f"{rng.choice(question_patterns)} {main_topic}"
         
         # Generate detailed answer
-        detailed_answer = self._generate_detailed_answer(paragraph, main_topic, content)
+        detailed_answer = self._generate_detailed_answer(paragraph, main_topic)
         
         return {
             'question': question,
@@ -190,50 +233,35 @@ class QuestionGenerator:
             'difficulty': difficulty
         }
     
-    def _extract_key_concept(self, sentence: str) -> str:
-        """Extract key concept from a sentence"""
-        words = word_tokenize(sentence)
-        pos_tags = pos_tag(words)
-        
+    def _extract_key_concept(self, pos_tags: List[Tuple[str, str]], scheduler: QuestionScheduler, question_type: str) -> str:
+        """Extract a key concept from a tagged sentence, avoiding concepts already asked about"""
         # Look for nouns and adjectives
         key_words = [word for word, pos in pos_tags if pos in ['NN', 'NNS', 'NNP', 'NNPS', 'JJ']]
         
-        if key_words:
-            return random.choice(key_words).capitalize()
+        concept = scheduler.pick_concept(question_type, key_words)
+        if concept:
+            return concept.capitalize()
         return None
     
-    def _extract_main_topic(self, paragraph: str) -> str:
-        """Extract main topic from a paragraph"""
-        sentences = sent_tokenize(paragraph)
-        if not sentences:
-            return None
-        
-        # Use the first sentence to extract topic
-        first_sentence = sentences[0]
-        words = word_tokenize(first_sentence)
-        pos_tags = pos_tag(words)
-        
+    def _extract_main_topic(self, pos_tags: List[Tuple[str, str]]) -> str:
+        """Extract main topic from the tagged first sentence of a paragraph"""
         # Find the main noun phrase
-        main_words = [word for word, pos in pos_tags if pos in ['NN', 'NNS', 'NNP', 'NNPS']]
+        main_words = [word for word, pos in pos_tags if pos in NOUN_TAGS]
         
         if main_words:
             return ' '.join(main_words[:3]).capitalize()
         return None
     
-    def _generate_distractors(self, key_terms: List[str], correct_answer: str) -> List[str]:
-        """Generate distractor options for MCQ"""
-        # Remove correct answer from key terms
-        other_terms = [term for term in key_terms if term.lower() != correct_answer.lower()]
-        
-        # Select random terms as distractors
-        distractors = random.sample(other_terms, min(3, len(other_terms)))
-        return [term.capitalize() for term in distractors]
+    def _generate_distractors(self, distractor_index: DistractorIndex, correct_answer: str, sentence_index: int,
+                              rng: random.Random) -> List[str]:
+        """Generate distractor options for MCQ: the terms used most like the answer elsewhere in the document"""
+        return distractor_index.distractors(correct_answer, 3, sentence_index, rng)
     
     def _generate_sample_answer(self, sentence: str, key_concept: str) -> str:
         """Generate sample answer for short answer question"""
         return f"Based on the text, {key_concept.lower()} refers to the concept mentioned in the context: '{sentence[:100]}...'"
     
-    def _generate_detailed_answer(self, paragraph: str, main_topic: str, content: str) -> str:
+    def _generate_detailed_answer(self, paragraph: str, main_topic: str) -> str:
         """Generate detailed answer for long answer question"""
         return f"""The {main_topic.lower()} is a significant concept that can be analyzed from multiple perspectives:
 
@@ -244,3 +272,30 @@ class QuestionGenerator:
 3. Implications: This concept has important implications for the broader context discussed in the document.
 
 4. Conclusion: Understanding {main_topic.lower()} is crucial for comprehending the overall subject matter."""
+
+def new_seed() -> int:
+    """Pick a fresh random seed for a paper, so it can be reproduced later"""
+    return random.SystemRandom().randrange(2 ** 32)
+
+_generator = None
+_generator_lock = threading.Lock()
+
+def get_question_generator() -> QuestionGenerator:
+    """
+    Get the process-wide QuestionGenerator, creating it on first use.
+    It holds only read-only state (stopwords, tagger model), so threads can share it.
+    """
+    global _generator
+    if _generator is None:
+        with _generator_lock:
+            if _generator is None:
+                _generator = QuestionGenerator()
+    return _generator
+
+def warmup() -> QuestionGenerator:
+    """
+    Load NLTK data, stopwords, tokenizer and tagger up front so the first request doesn't pay for it
+    """
+    generator = get_question_generator()
+    generator.analyze("Warm up the sentence tokenizer and the part of speech tagger.")
+    return generator
@@ -0,0 +1,110 @@
+import random
+from typing import Iterable, List, Optional, Sequence
+import numpy as np
+from document_analysis import DocumentAnalysis
+
+class StratifiedPool:
+    """
+    Draws ids without replacement, spread evenly over strata (sections or pages).
+
+    The draw order is fixed up front: ids are shuffled within their stratum
+    and interleaved in proportion to stratum size, so the first n draws cover
+    the document evenly. Tiers are drawn one after another (e.g. preferred
+    sentences first). Ids marked in a shared `used` bitmap are skipped, so
+    several pools can share one set of sentences.
+    """
+
+    def __init__(self, tiers: Sequence[Iterable[int]], strata: np.ndarray, rng: random.Random,
+                 used: Optional[np.ndarray] = None):
+        # NumPy generator derived from the caller's RNG, so a seeded caller gets a reproducible order
+        np_rng = np.random.default_rng(rng.getrandbits(64))
+        self._order: List[int] = []
+        for ids in tiers:
+            self._order.extend(self._stratified_order(np.fromiter(ids, dtype=np.int64), strata, np_rng))
+        self._next = 0
+        self._used = used
+
+    @staticmethod
+    def _stratified_order(ids: np.ndarray, strata: np.ndarray, np_rng: np.random.Generator) -> List[int]:
+        if not len(ids):
+            return []
+        groups = strata[ids]
+        # Random rank of every id within its stratum
+        shuffled = np_rng.permutation(len(ids))
+        by_group = shuffled[np.argsort(groups[shuffled], kind='stable')]
+        group_sizes = np.bincount(groups)
+        group_starts = np.concatenate(([0], np.cumsum(group_sizes)[:-1]))
+        ranks = np.empty(len(ids))
+        ranks[by_group] = np.arange(len(ids)) - group_starts[groups[by_group]]
+
+        # The k-th id of a stratum of size n is drawn around position k/n of the whole order
+        keys = (ranks + np_rng.random(len(ids))) / group_sizes[groups]
+        return ids[np.argsort(keys, kind='stable')].tolist()
+
+    def __len__(self) -> int:
+        return len(self._order) - self._next
+
+    def draw(self) -> Optional[int]:
+        """Next unused id, or None once the pool is exhausted"""
+        while self._next < len(self._order):
+            item = self._order[self._next]
+            self._next += 1
+            if self._used is None or not self._used[item]:
+                return item
+        return None
+
+class QuestionScheduler:
+    """
+    Plans which sentences, paragraphs and concepts the questions of one paper use.
+
+    Sentences are shared by MCQ and short-answer questions and paragraphs
+    are used by long answers; each is drawn at most once per question type,
+    stratified by section, and a sentence that produced a question (or
+    repeats an earlier sentence word for word) is skipped by the other
+    type too. Concepts (answers and topics) never repeat within a question
+    type, and concepts not yet asked about anywhere in the paper are
+    preferred.
+    """
+
+    def __init__(self, analysis: DocumentAnalysis, rng: random.Random, mcq_terms: int = 10):
+        self.rng = rng
+        sections = analysis.sentence_sections()
+        self.used_sentences = np.zeros(len(analysis.sentences), dtype=bool)
+        # Repeated sentences are found by hash, confirmed against the text of the first
+        # sentence with that hash, so only indices are kept rather than copies of every sentence
+        first_by_hash = {}
+        for i, sentence in enumerate(analysis.sentences):
+            first = first_by_hash.setdefault(hash(sentence), i)
+            if first != i and analysis.sentences[first] == sentence:
+                self.used_sentences[i] = True
+        self.used_concepts = set()
+        self._used_by_type = {}
+
+        # MCQs prefer sentences containing the top key terms, then fall back to the rest
+        preferred = analysis.sentences_with_terms(analysis.key_terms[:mcq_terms])
+        others = np.setdiff1d(np.arange(len(analysis.sentences)), preferred)
+        self.mcq_sentences = StratifiedPool([preferred, others], sections, rng, self.used_sentences)
+        self.short_answer_sentences = StratifiedPool([range(len(analysis.sentences))], sections, rng, self.used_sentences)
+
+        paragraph_sections = np.array([sections[first] for first, _ in analysis.paragraphs], dtype=np.int64)
+        self.paragraphs = StratifiedPool([range(len(analysis.paragraphs))], paragraph_sections, rng)
+
+    def use_sentence(self, index: int):
+        """Mark a sentence as asked about, so no other question uses it"""
+        self.used_sentences[index] = True
+
+    def pick_concept(self, question_type: str, candidates: List[str]) -> Optional[str]:
+        """Choose a candidate concept not used by this question type yet, and mark it used"""
+        used_by_type = self._used_by_type.setdefault(question_type, set())
+        unused = [word for word in candidates if word.lower() not in used_by_type]
+        fresh = [word for word in unused if word.lower() not in self.used_concepts]
+        if not (fresh or unused):
+            return None
+        concept = self.rng.choice(fresh or unused)
+        used_by_type.add(concept.lower())
+        self.used_concepts.add(concept.lower())
+        return concept
+
+    def use_concept(self, question_type: str, concept: str) -> bool:
+        """Mark a concept used; False if this question type already used it"""
+        return self.pick_concept(question_type, [concept]) is not None
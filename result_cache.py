@@ -0,0 +1,43 @@
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+class ResultCache:
+    """
+    In-memory LRU cache of generated question papers.
+
+    Generation is deterministic for a given document, requirements and seed,
+    so a paper keyed by (content hash, requirements, seed) can be served again
+    without re-running extraction, analysis or generation. Holds at most
+    max_entries papers; the least recently used one is dropped first.
+    """
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._entries: 'OrderedDict[Tuple[str, str, int], Dict[str, Any]]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(content_hash: str, requirements: Dict[str, Any], seed: int) -> Tuple[str, str, int]:
+        """Cache key; requirements are serialized canonically so key order doesn't matter"""
+        return content_hash, json.dumps(requirements, sort_keys=True), seed
+
+    def get(self, key: Tuple[str, str, int]) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            questions = self._entries.get(key)
+            if questions is not None:
+                self._entries.move_to_end(key)
+            return questions
+
+    def put(self, key: Tuple[str, str, int], questions: Dict[str, Any]):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = questions
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
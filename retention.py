@@ -0,0 +1,109 @@
+import os
+import time
+import shutil
+import threading
+from typing import List, Optional, Tuple
+
+class RetentionPolicy:
+    """
+    Deletes old files and directories from storage directories (outputs/,
+    uploads/) so they don't grow without bound.
+
+    Entries older than max_age seconds are removed; then, while the
+    directories together are larger than max_bytes, the least recently
+    modified entries go first. Entries modified within the last min_age
+    seconds (a running /batch directory, a paper whose download link was
+    just returned) and temporary files of writes in progress are only ever
+    removed by age. Hidden entries such as .gitkeep are never removed.
+    start() runs collect() every interval seconds in a daemon thread.
+    """
+
+    def __init__(self, directories: List[str], max_age: Optional[float] = None,
+                 max_bytes: Optional[int] = None, interval: float = 600, min_age: float = 3600):
+        self.directories = directories
+        self.max_age = max_age
+        self.max_bytes = max_bytes
+        self.interval = interval
+        self.min_age = min_age
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None and (self.max_age or self.max_bytes):
+            self._thread = threading.Thread(target=self._run, name='retention', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.collect()
+            except Exception:
+                # A failed pass is retried at the next interval
+                pass
+
+    def collect(self) -> int:
+        """Apply the policy once; returns the number of entries removed"""
+        now = time.time()
+        removed = 0
+        kept = []
+        for mtime, size, path in self._entries():
+            if self.max_age and now - mtime > self.max_age:
+                removed += self._remove(path)
+            else:
+                kept.append((mtime, size, path))
+
+        if self.max_bytes:
+            total = sum(size for _, size, _ in kept)
+            for mtime, size, path in sorted(kept):
+                if total <= self.max_bytes:
+                    break
+                if path.endswith('.tmp') or now - mtime < self.min_age:
+                    continue
+                removed += self._remove(path)
+                total -= size
+        return removed
+
+    def _entries(self) -> List[Tuple[float, int, str]]:
+        """(modification time, size, path) of each visible top-level entry of the directories"""
+        entries = []
+        for directory in self.directories:
+            try:
+                names = os.listdir(directory)
+            except FileNotFoundError:
+                continue
+            for name in names:
+                if name.startswith('.'):
+                    continue
+                path = os.path.join(directory, name)
+                try:
+                    stat = os.stat(path)
+                    size = self._tree_size(path) if os.path.isdir(path) else stat.st_size
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, size, path))
+        return entries
+
+    @staticmethod
+    def _tree_size(path: str) -> int:
+        total = 0
+        for root, _, files in os.walk(path):
+            for name in files:
+                try:
+                    total += os.path.getsize(os.path.join(root, name))
+                except OSError:
+                    pass
+        return total
+
+    @staticmethod
+    def _remove(path: str) -> int:
+        try:
+            if os.path.isdir(path):
+                shutil.rmtree(path)
+            else:
+                os.remove(path)
+            return 1
+        except OSError:
+            return 0
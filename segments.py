@@ -0,0 +1,76 @@
+from array import array
+from io import StringIO
+from typing import Iterator, List, Tuple, Union
+
+SEGMENT_PARAGRAPH = 0
+SEGMENT_HEADING = 1
+
+# (text, kind, page) as produced by DocumentProcessor.iter_segments()
+Segment = Tuple[str, int, int]
+
+class TextTable:
+    """
+    Compact table of strings (e.g. the sentences of a document).
+
+    All text lives in one string buffer, rows separated by separator; each
+    row is a pair of start/end offsets in parallel arrays, so large documents
+    don't keep one string object per row. Consecutive rows first..end-1 are a
+    single slice of the buffer (span()), already joined by the separator.
+    """
+
+    def __init__(self, separator: str = '\n'):
+        self.separator = separator
+        self.starts = array('l')
+        self.ends = array('l')
+        self._buffer = StringIO()
+        self._length = 0
+        self._text = ''
+
+    def add(self, text: str) -> int:
+        """Append a row; returns its index"""
+        if self._buffer is None:
+            # Rows added after the text was read continue the same buffer
+            self._buffer = StringIO(self._text)
+            self._buffer.seek(0, 2)
+        if self.starts:
+            self._buffer.write(self.separator)
+            self._length += len(self.separator)
+        self.starts.append(self._length)
+        self._buffer.write(text)
+        self._length += len(text)
+        self.ends.append(self._length)
+        return len(self.starts) - 1
+
+    @property
+    def text(self) -> str:
+        """All rows joined by the separator"""
+        if self._buffer is not None:
+            self._text = self._buffer.getvalue()
+            self._buffer = None
+        return self._text
+
+    def span(self, first: int, end: int) -> str:
+        """Rows first..end-1 joined by the separator"""
+        if first >= end:
+            return ''
+        return self.text[self.starts[first]:self.ends[end - 1]]
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[str, List[str]]:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        return self.text[self.starts[index]:self.ends[index]]
+
+    def __iter__(self) -> Iterator[str]:
+        text = self.text
+        for start, end in zip(self.starts, self.ends):
+            yield text[start:end]
+
+    def __getstate__(self):
+        # Pickle the finished text rather than the buffer
+        state = self.__dict__.copy()
+        state['_text'] = self.text
+        state['_buffer'] = None
+        return state
@@ -0,0 +1,29 @@
+#!/usr/bin/env python3
+"""
+Production server for the Question Answer Generator
+
+Serves the Flask app with waitress, a multi-threaded WSGI server, instead of
+the single-user development server. NLTK data and the tagger are loaded
+once before the first request and shared read-only by all request threads.
+
+Example:
+    python serve.py --host 0.0.0.0 --port 8000 --threads 8
+"""
+
+import argparse
+from waitress import serve
+from app import app
+from question_generator import warmup
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Serve the Question Answer Generator with waitress')
+    parser.add_argument('--host', default='0.0.0.0', help='Interface to listen on')
+    parser.add_argument('--port', type=int, default=5000, help='Port to listen on')
+    parser.add_argument('--threads', type=int, default=app.config['SERVER_THREADS'], help='Request threads')
+    args = parser.parse_args(argv)
+
+    warmup()
+    serve(app, host=args.host, port=args.port, threads=args.threads)
+
+if __name__ == "__main__":
+    main()
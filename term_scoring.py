@@ -0,0 +1,66 @@
+from typing import Optional
+import numpy as np
+from scipy import sparse
+
+SCORING_METHODS = ('bm25', 'tfidf')
+
+class TermScorer:
+    """
+    TF-IDF or BM25 weights over a sparse unit x term count matrix.
+
+    The units are the rows of the matrix (sentences), or groups of them such
+    as sections when a group id is given per row. A term's overall score is
+    the sum of its weights over all units, so terms that are frequent but
+    spread evenly through the document rank below topical ones.
+    """
+
+    def __init__(self, counts: sparse.spmatrix, method: str = 'bm25', groups: Optional[np.ndarray] = None,
+                 k1: float = 1.5, b: float = 0.75):
+        if method not in SCORING_METHODS:
+            raise ValueError(f"Unknown term scoring method: {method}")
+        counts = sparse.csr_matrix(counts, dtype=np.float64)
+        if groups is not None and counts.shape[0]:
+            # Sum the rows of each group: (groups x rows) indicator matrix times counts
+            indicator = sparse.csr_matrix((np.ones(len(groups)), (groups, np.arange(len(groups)))),
+                                          shape=(int(groups.max()) + 1, len(groups)))
+            counts = indicator @ counts
+        self.counts = counts
+        self.weights = self._bm25(k1, b) if method == 'bm25' else self._tfidf()
+        self.term_scores = np.asarray(self.weights.sum(axis=0)).ravel()
+
+    def _document_frequency(self) -> np.ndarray:
+        return np.bincount(self.counts.indices, minlength=self.counts.shape[1])
+
+    def _tfidf(self) -> sparse.csr_matrix:
+        """Raw term counts times the smoothed inverse document frequency"""
+        units = self.counts.shape[0]
+        idf = np.log((1 + units) / (1 + self._document_frequency())) + 1
+        return sparse.csr_matrix(self.counts.multiply(idf.reshape(1, -1)))
+
+    def _bm25(self, k1: float, b: float) -> sparse.csr_matrix:
+        """Okapi BM25 weights: saturating term frequency, normalized by unit length"""
+        units = self.counts.shape[0]
+        df = self._document_frequency()
+        idf = np.log(1 + (units - df + 0.5) / (df + 0.5))
+
+        lengths = np.asarray(self.counts.sum(axis=1)).ravel()
+        average_length = lengths.mean() if units and lengths.mean() else 1.0
+        weights = self.counts.copy()
+        # Each stored value belongs to the row given by the row index of its position
+        rows = np.repeat(np.arange(units), np.diff(weights.indptr))
+        tf = weights.data
+        norm = k1 * (1 - b + b * lengths[rows] / average_length)
+        weights.data = idf[weights.indices] * tf * (k1 + 1) / (tf + norm)
+        return weights
+
+    def top_terms(self, k: int) -> np.ndarray:
+        """Column ids of the k best scoring terms, best first"""
+        scores = self.term_scores
+        if k <= 0 or not len(scores):
+            return np.empty(0, dtype=np.int64)
+        if k < len(scores):
+            # Partial selection, then sort only the k winners
+            candidates = np.argpartition(-scores, k - 1)[:k]
+        else:
+            candidates = np.arange(len(scores))
+        return candidates[np.argsort(-scores[candidates], kind='stable')]
@@ -7,7 +7,7 @@ import os
 import sys
 import json
 from document_processor import DocumentProcessor
-from question_generator import QuestionGenerator
+from question_generator import get_question_generator
 
 def test_document_processing():
     """Test document processing functionality"""
@@ -56,7 +56,7 @@ def test_question_generation():
     }
     
     try:
-        generator = QuestionGenerator()
+        generator = get_question_generator()
         questions = generator.generate_questions(sample_content, requirements)
         
         print(f"✓ Generated {len(questions.get('mcq', []))} MCQ questions")
@@ -0,0 +1,69 @@
+import os
+import json
+import zipfile
+import pytest
+from batch_processor import BatchProcessor
+
+def write_zip(path, members):
+    with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as archive:
+        for name, data in members.items():
+            archive.writestr(name, data)
+    return str(path)
+
+def test_expand_zip_records_archive_names(tmp_path):
+    archive = write_zip(tmp_path / 'pack.zip', {'docs/My Chapter.pdf': b'%PDF', 'notes.txt': b'skipped', 'a.docx': b'PK'})
+    target = tmp_path / 'out'
+    target.mkdir()
+    names = {}
+    
+    paths = BatchProcessor.expand_zip(archive, str(target), names)
+    
+    assert sorted(os.path.basename(path) for path in paths) == ['My_Chapter.pdf', 'a.docx']
+    assert names[str(target / 'My_Chapter.pdf')] == ['docs/My Chapter.pdf', 'My Chapter.pdf']
+
+def test_expand_zip_limits_member_count(tmp_path):
+    archive = write_zip(tmp_path / 'pack.zip', {f'{i}.pdf': b'%PDF' for i in range(3)})
+    with pytest.raises(ValueError):
+        BatchProcessor.expand_zip(archive, str(tmp_path), max_members=2)
+
+def test_expand_zip_limits_uncompressed_size(tmp_path):
+    archive = write_zip(tmp_path / 'bomb.zip', {'a.pdf': b'\0' * 600, 'b.pdf': b'\0' * 600})
+    target = tmp_path / 'out'
+    target.mkdir()
+    with pytest.raises(ValueError):
+        BatchProcessor.expand_zip(archive, str(target), max_bytes=1000)
+    # The second member is refused from its header, before it is written
+    assert os.listdir(target) == ['a.pdf']
+
+def test_overrides_match_the_original_name():
+    processor = BatchProcessor(workers=1)
+    requirements = {'mcq_count': 4, 'My Chapter.pdf': {'mcq_count': 9, 'pages': '2-3'}}
+    
+    resolved = processor._requirements_for(['My Chapter.pdf', 'My_Chapter.pdf'], requirements)
+    assert resolved['mcq_count'] == 9
+    assert resolved['pages'] == [(1, 3)]
+    
+    assert processor._requirements_for(['other.pdf'], requirements)['mcq_count'] == 4
+
+def test_null_override_is_a_value_error():
+    processor = BatchProcessor(workers=1)
+    for value in (None, [3], True):
+        with pytest.raises(ValueError):
+            processor._requirements_for(['a.pdf'], {'a.pdf': {'mcq_count': value}})
+    with pytest.raises(ValueError):
+        processor._requirements_for(['a.pdf'], {'a.pdf': {'pages': 5}})
+
+def test_archive_keeps_files_with_the_same_stem(tmp_path):
+    results = {
+        'ch1.pdf': {'questions': {'mcq': ['from pdf']}, 'seed': 1},
+        'ch1.docx': {'questions': {'mcq': ['from docx']}, 'seed': 1},
+        'ch1.doc': {'error': 'Error processing file: broken'}
+    }
+    path = tmp_path / 'results.zip'
+    
+    BatchProcessor.write_archive(results, str(path))
+    
+    with zipfile.ZipFile(path) as archive:
+        assert sorted(archive.namelist()) == ['errors.json', 'questions_ch1.docx.json', 'questions_ch1.pdf.json']
+        assert json.loads(archive.read('questions_ch1.docx.json')) == {'mcq': ['from docx']}
+        assert json.loads(archive.read('errors.json')) == {'ch1.doc': 'Error processing file: broken'}
@@ -0,0 +1,63 @@
+import json
+import os
+import pytest
+from docx import Document
+from cli import main
+from question_generator import nltk_data_available
+
+pytestmark = pytest.mark.skipif(not nltk_data_available(), reason="NLTK data is not installed")
+
+PARAGRAPHS = [
+    "Photosynthesis converts light energy into chemical energy in the chloroplasts of plant cells.",
+    "Chlorophyll absorbs red and blue light and reflects green light, which gives leaves their colour.",
+    "Cellular respiration releases the energy stored in glucose inside the mitochondria of cells.",
+    "Enzymes are proteins that speed up chemical reactions without being used up themselves.",
+]
+
+def write_docx(path, page_breaks=0):
+    document = Document()
+    for i, text in enumerate(PARAGRAPHS):
+        document.add_paragraph(text)
+        if i < page_breaks:
+            document.add_page_break()
+    document.save(str(path))
+
+def run_cli(capsys, *args):
+    with pytest.raises(SystemExit) as exit_info:
+        main([*args, '--workers', '1', '--seed', '3', '--mcq', '1', '--short', '1', '--long', '0'])
+    return exit_info.value.code, capsys.readouterr().err
+
+def test_cli_writes_one_result_per_document(tmp_path, capsys):
+    inputs = tmp_path / 'docs'
+    (inputs / 'unit1').mkdir(parents=True)
+    write_docx(inputs / 'intro.docx')
+    write_docx(inputs / 'unit1' / 'cells.docx', page_breaks=2)
+    output = tmp_path / 'questions.jsonl'
+    
+    code, log = run_cli(capsys, str(inputs), '--output', str(output))
+    
+    assert code == 0
+    results = {os.path.basename(result['source']): result for result in map(json.loads, output.read_text().splitlines())}
+    assert sorted(results) == ['cells.docx', 'intro.docx']
+    # Word pages are counted from page breaks
+    assert results['intro.docx']['pages'] == 1
+    assert results['cells.docx']['pages'] == 3
+    assert all(result['seed'] == 3 and result['questions']['short_answer'] for result in results.values())
+    assert 'Finished: 2 documents (0 failed), 4 pages' in log
+
+def test_cli_reports_failures_and_resumes(tmp_path, capsys):
+    inputs = tmp_path / 'docs'
+    inputs.mkdir()
+    write_docx(inputs / 'intro.docx')
+    (inputs / 'broken.pdf').write_bytes(b'not a pdf')
+    output = tmp_path / 'out'
+    
+    code, log = run_cli(capsys, str(inputs), '--output', str(output), '--format', 'files')
+    assert code == 1
+    assert 'Failed:' in log and 'broken.pdf' in log
+    assert sorted(os.listdir(output)) == ['.checkpoint', 'questions_broken.json', 'questions_intro.json']
+    
+    code, log = run_cli(capsys, str(inputs), '--output', str(output), '--format', 'files', '--resume')
+    assert code == 0
+    assert 'skipping 2 already processed documents' in log
+    assert 'Finished: 0 documents' in log
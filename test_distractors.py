@@ -0,0 +1,60 @@
+import random
+import pytest
+from distractors import DistractorIndex
+from document_analysis import DocumentAnalysis
+from question_generator import nltk_data_available
+
+pytestmark = pytest.mark.skipif(not nltk_data_available(), reason="NLTK data is not installed")
+
+STOP_WORDS = {'the', 'a', 'of', 'and', 'in', 'by', 'is', 'are', 'with', 'to', 'from', 'into', 'their'}
+
+CONTENT = """Photosynthesis converts sunlight into chemical energy in chloroplasts.
+Chlorophyll absorbs sunlight in the leaves of green plants.
+Respiration releases energy from glucose in mitochondria.
+Mitochondria and chloroplasts are organelles of plant cells.
+Enzymes speed up reactions in cells and organelles.
+Glucose is stored as starch in roots and leaves.
+Roots absorb water and minerals from the soil.
+Stomata in leaves exchange oxygen and carbon dioxide with the air.
+"""
+
+@pytest.fixture(scope='module')
+def analysis():
+    return DocumentAnalysis(CONTENT, STOP_WORDS)
+
+def test_distractors_never_include_the_answer(analysis):
+    index = DistractorIndex(analysis)
+    for term in analysis.terms:
+        chosen = index.distractors(term.capitalize(), 3, rng=random.Random(1))
+        assert term not in [option.lower() for option in chosen]
+        assert len(set(chosen)) == len(chosen)
+
+def test_distractors_come_from_the_document(analysis):
+    index = DistractorIndex(analysis)
+    for term in analysis.key_terms:
+        chosen = index.distractors(term, 3, sentence_index=0, rng=random.Random(2))
+        assert chosen
+        assert all(option.lower() in analysis.vocabulary for option in chosen)
+
+def test_distractors_are_deterministic_for_a_seeded_rng(analysis):
+    first = [DistractorIndex(analysis).distractors(term, 3, rng=random.Random(7)) for term in analysis.key_terms]
+    second = [DistractorIndex(analysis).distractors(term, 3, rng=random.Random(7)) for term in analysis.key_terms]
+    assert first == second
+
+def test_neighbours_share_the_answers_kind(analysis):
+    index = DistractorIndex(analysis)
+    for term in analysis.terms:
+        kind = analysis.term_kinds[analysis.vocabulary[term]]
+        assert all(analysis.term_kinds[analysis.vocabulary[other]] == kind for other in index.neighbours(term, 3))
+
+def test_document_with_too_few_terms():
+    analysis = DocumentAnalysis("Glucose is in cells.", STOP_WORDS)
+    assert sorted(analysis.terms) == ['cells', 'glucose']
+    
+    assert DistractorIndex(analysis).distractors('Glucose', 3, rng=random.Random(3)) == ['Cells']
+    # Every term of the question sentence is excluded, leaving nothing to offer
+    assert DistractorIndex(analysis).distractors('Glucose', 3, sentence_index=0, rng=random.Random(3)) == []
+
+def test_document_without_terms():
+    analysis = DocumentAnalysis("", STOP_WORDS)
+    assert DistractorIndex(analysis).distractors('Glucose', 3, rng=random.Random(3)) == []
@@ -0,0 +1,32 @@
+import pytest
+from document_analysis import DocumentAnalysis
+from question_generator import nltk_data_available
+from segments import SEGMENT_PARAGRAPH
+
+pytestmark = pytest.mark.skipif(not nltk_data_available(), reason="NLTK data is not installed")
+
+FIRST_PAGE = ("Photosynthesis converts light energy into chemical energy in the chloroplasts of plant cells. "
+              "The light reactions take place in the thylakoid membranes and produce")
+LATER_PAGE = ("tariffs that were raised by the government during the trade dispute between the two countries. "
+              "Exporters reported falling orders for the rest of the year.")
+
+def analyze(segments):
+    return DocumentAnalysis(segments, stop_words={'the', 'of', 'in', 'and', 'by', 'for', 'that', 'were'})
+
+def paragraph_pages(analysis):
+    return [set(analysis.sentence_pages[first:end]) for first, end in analysis.paragraphs]
+
+def test_sentences_do_not_continue_across_skipped_pages():
+    analysis = analyze([(FIRST_PAGE, SEGMENT_PARAGRAPH, 0), (LATER_PAGE, SEGMENT_PARAGRAPH, 7)])
+    
+    assert not any('produce tariffs' in sentence for sentence in analysis.sentences)
+    assert analysis.sentences[1].endswith('produce')
+    assert list(analysis.sentence_pages) == [0, 0, 7, 7]
+    assert all(len(pages) == 1 for pages in paragraph_pages(analysis))
+    assert analysis.page_count == 8
+
+def test_sentences_continue_on_the_next_page():
+    analysis = analyze([(FIRST_PAGE, SEGMENT_PARAGRAPH, 0), (LATER_PAGE, SEGMENT_PARAGRAPH, 1)])
+    
+    assert any('produce tariffs' in sentence for sentence in analysis.sentences)
+    assert list(analysis.sentence_pages) == [0, 0, 0]
@@ -0,0 +1,64 @@
+from docx import Document
+from docx.enum.text import WD_BREAK
+from docx.oxml import OxmlElement
+import pytest
+from docx_reader import iter_docx_blocks
+from document_processor import DocumentProcessor
+from segments import SEGMENT_HEADING, SEGMENT_PARAGRAPH
+
+def add_rendered_break(paragraph, text):
+    """A run starting with the w:lastRenderedPageBreak Word writes where a page begins"""
+    run = paragraph.add_run(text)
+    run._r.insert(0, OxmlElement('w:lastRenderedPageBreak'))
+
+def write_document(path, with_table=True):
+    doc = Document()
+    doc.add_heading("Chapter One", level=1)
+    doc.add_paragraph("Intro text on the first page.")
+    # Explicit page break; Word marks the start of the next page with a rendered break too
+    doc.add_paragraph().add_run().add_break(WD_BREAK.PAGE)
+    add_rendered_break(doc.add_paragraph(), "Text on the second page.")
+    # A page that only Word's layout broke
+    add_rendered_break(doc.add_paragraph(), "Text on the third page.")
+    # Explicit break in the middle of a paragraph, rendered break right after it
+    paragraph = doc.add_paragraph("End of the third page.")
+    paragraph.add_run().add_break(WD_BREAK.PAGE)
+    add_rendered_break(paragraph, "Start of the fourth page.")
+    
+    if with_table:
+        table = doc.add_table(rows=2, cols=3)
+        table.cell(0, 0).merge(table.cell(1, 0)).text = "Merged down"
+        table.cell(0, 1).merge(table.cell(0, 2)).text = "Merged across"
+        table.cell(1, 1).text = "b"
+        table.cell(1, 2).text = "c"
+    doc.save(path)
+    return path
+
+def test_headings_pages_and_merged_cells(tmp_path):
+    blocks = list(iter_docx_blocks(write_document(tmp_path / 'doc.docx')))
+    
+    assert blocks == [
+        ("Chapter One", True, 0),
+        ("Intro text on the first page.", False, 0),
+        ("Text on the second page.", False, 1),
+        ("Text on the third page.", False, 2),
+        ("End of the third page.Start of the fourth page.", False, 2),
+        ("Merged down Merged across", False, 3),
+        ("b c", False, 3),
+    ]
+
+@pytest.mark.parametrize('engine', ['stream', 'python-docx'])
+def test_engines_count_each_page_once(tmp_path, engine):
+    path = str(write_document(tmp_path / 'doc.docx', with_table=False))
+    segments = list(DocumentProcessor(workers=1, word_engine=engine).iter_segments(path))
+    
+    assert [(kind, page) for _, kind, page in segments] == [
+        (SEGMENT_HEADING, 0), (SEGMENT_PARAGRAPH, 0), (SEGMENT_PARAGRAPH, 1),
+        (SEGMENT_PARAGRAPH, 2), (SEGMENT_PARAGRAPH, 2),
+    ]
+
+def test_engines_give_the_same_paragraphs(tmp_path):
+    path = str(write_document(tmp_path / 'doc.docx', with_table=False))
+    stream = list(DocumentProcessor(workers=1, word_engine='stream').iter_segments(path))
+    full = list(DocumentProcessor(workers=1, word_engine='python-docx').iter_segments(path))
+    assert stream == full
@@ -0,0 +1,67 @@
+import os
+import threading
+import time
+from export_cache import ExportCache
+
+def test_concurrent_requests_render_once():
+    cache = ExportCache()
+    renders = []
+    start = threading.Barrier(16)
+    
+    def render():
+        renders.append(1)
+        time.sleep(0.05)
+        return b'%PDF'
+    
+    def request():
+        start.wait()
+        assert cache.get_or_render(('hash', 'pdf'), render) == b'%PDF'
+    
+    threads = [threading.Thread(target=request) for _ in range(16)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    assert len(renders) == 1
+    assert cache._rendering == {}
+
+def test_least_recently_used_export_is_dropped():
+    cache = ExportCache(max_entries=2)
+    cache.put(('a', 'pdf'), b'a')
+    cache.put(('b', 'pdf'), b'b')
+    cache.get(('a', 'pdf'))
+    cache.put(('c', 'pdf'), b'c')
+    
+    assert cache.get(('b', 'pdf')) is None
+    assert cache.get(('a', 'pdf')) == b'a'
+    assert len(cache) == 2
+
+def test_concurrent_large_exports_render_once_into_a_file(tmp_path):
+    cache = ExportCache(max_entries=0, directory=str(tmp_path))
+    renders = []
+    start = threading.Barrier(16)
+    
+    def render(f):
+        renders.append(1)
+        time.sleep(0.05)
+        f.write(b'%PDF large')
+    
+    def request():
+        start.wait()
+        with cache.open_or_render(('hash', 'pdf'), render) as f:
+            assert f.read() == b'%PDF large'
+    
+    threads = [threading.Thread(target=request) for _ in range(16)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    assert len(renders) == 1
+    assert os.listdir(tmp_path) == ['export_hash.pdf']
+    
+    # A file removed by the retention policy is rendered again
+    os.remove(tmp_path / 'export_hash.pdf')
+    cache.open_or_render(('hash', 'pdf'), render).close()
+    assert len(renders) == 2
@@ -0,0 +1,91 @@
+import hashlib
+import io
+import os
+from types import SimpleNamespace
+from extraction_cache import ExtractionCache
+from page_budget import analyze_within_budget
+
+CONTENT = b'%PDF-1.4 not really a pdf'
+CONTENT_HASH = hashlib.sha256(CONTENT).hexdigest()
+REQUIREMENTS = {'mcq_count': 0, 'short_answer_count': 1, 'long_answer_count': 0}
+
+def analysis(text='analysis'):
+    """Picklable stand-in exposing what the page budget reads"""
+    return SimpleNamespace(text=text, sentences=['a'] * 10, paragraphs=[], key_terms=[])
+
+def test_hash_file_is_the_sha256_of_the_content(tmp_path):
+    path = tmp_path / 'doc.pdf'
+    path.write_bytes(CONTENT)
+    stream = io.BytesIO(CONTENT)
+    
+    assert ExtractionCache.hash_file(CONTENT) == CONTENT_HASH
+    assert ExtractionCache.hash_file(str(path)) == CONTENT_HASH
+    assert ExtractionCache.hash_file(stream) == CONTENT_HASH
+    assert stream.tell() == 0
+
+def test_hit_and_miss_by_content_hash(tmp_path):
+    cache = ExtractionCache(str(tmp_path))
+    assert cache.get(ExtractionCache.key(CONTENT_HASH)) is None
+    
+    cache.put(ExtractionCache.key(CONTENT_HASH), analysis())
+    
+    assert cache.get(ExtractionCache.key(CONTENT_HASH)).text == 'analysis'
+    assert cache.get(ExtractionCache.key(hashlib.sha256(b'other').hexdigest())) is None
+
+def test_key_changes_with_pages_and_options():
+    keys = {
+        ExtractionCache.key(CONTENT_HASH),
+        ExtractionCache.key(CONTENT_HASH, [(0, 10)]),
+        ExtractionCache.key(CONTENT_HASH, [(0, 11)]),
+        ExtractionCache.key(CONTENT_HASH, [0, 1, 2]),
+        ExtractionCache.key(CONTENT_HASH, None, {'max_ngram': 3}),
+        ExtractionCache.key(CONTENT_HASH, None, {'max_ngram': 2}),
+        ExtractionCache.key(CONTENT_HASH, [(0, 10)], {'max_ngram': 3}),
+    }
+    assert len(keys) == 7
+    assert ExtractionCache.key(CONTENT_HASH, None, {'a': 1, 'b': 2}) == ExtractionCache.key(CONTENT_HASH, None, {'b': 2, 'a': 1})
+
+def test_analyses_are_invalidated_by_options_and_page_ranges(tmp_path):
+    cache = ExtractionCache(str(tmp_path))
+    processor = SimpleNamespace(word_engine='stream', count_pages=lambda source, filename: None,
+                                iter_segments=lambda source, filename, pages=None: iter([('text', 0, 0)]))
+    analyzed = []
+    
+    def analyze(segments):
+        list(segments)
+        analyzed.append(1)
+        return analysis()
+    
+    def run(pages=None, options=None, engine='stream'):
+        processor.word_engine = engine
+        analyze_within_budget(processor, analyze, 'doc.docx', None, REQUIREMENTS, pages,
+                              cache=cache, content_hash=CONTENT_HASH, options=options)
+        return len(analyzed)
+    
+    assert run(options={'max_ngram': 3}) == 1
+    assert run(options={'max_ngram': 3}) == 1
+    assert run(options={'max_ngram': 2}) == 2
+    assert run(options={'max_ngram': 3}, engine='python-docx') == 3
+    assert run([(0, 5)], options={'max_ngram': 3}) == 4
+    assert run([(0, 5)], options={'max_ngram': 3}) == 4
+
+def test_corrupt_entries_are_dropped(tmp_path):
+    cache = ExtractionCache(str(tmp_path))
+    key = ExtractionCache.key(CONTENT_HASH)
+    cache.put(key, analysis())
+    path = cache._path(key)
+    
+    # Truncated, e.g. by a full disk or an interrupted copy of the cache directory
+    with open(path, 'r+b') as f:
+        f.truncate(os.path.getsize(path) // 2)
+    assert cache.get(key) is None
+    assert not os.path.exists(path)
+    
+    with open(path, 'wb') as f:
+        f.write(b'not a pickle')
+    assert cache.get(key) is None
+    assert not os.path.exists(path)
+    
+    # The entry is written again on the next miss
+    cache.put(key, analysis('fresh'))
+    assert cache.get(key).text == 'fresh'
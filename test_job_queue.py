@@ -0,0 +1,33 @@
+import json
+import threading
+from job_queue import Job
+
+def test_to_dict_is_a_snapshot():
+    job = Job()
+    job.start_stage('extract')
+    job.update_stage('extract', pages=3)
+    snapshot = job.to_dict()
+    
+    job.update_stage('extract', pages=4)
+    job.finish_stage('extract')
+    
+    assert snapshot['stages']['extract'] == {'status': 'running', 'pages': 3}
+    assert snapshot['progress'] == 0
+    assert job.to_dict()['progress'] == 0.25
+
+def test_to_dict_while_the_worker_updates():
+    job = Job()
+    
+    def work():
+        for page in range(5000):
+            job.update_stage('extract', **{f'counter_{page}': page})
+    
+    worker = threading.Thread(target=work)
+    worker.start()
+    try:
+        while worker.is_alive():
+            # Serializing must not see the worker's dicts change size
+            json.dumps(job.to_dict())
+    finally:
+        worker.join()
+    assert len(job.to_dict()['stages']['extract']) == 5001
@@ -0,0 +1,29 @@
+import tracemalloc
+import metrics
+
+def observed_peak(name):
+    """Sum of the peaks recorded for a stage, or None if none was recorded"""
+    series = metrics.STAGE_PEAK_BYTES._series.get((name,))
+    return series[1] if series else None
+
+def test_nested_stage_keeps_the_outer_peak():
+    tracemalloc.start()
+    try:
+        with metrics.stage('test_outer'):
+            big = bytearray(8 * 1024 * 1024)
+            del big
+            with metrics.stage('test_inner'):
+                small = bytearray(1024)
+                del small
+    finally:
+        tracemalloc.stop()
+    
+    assert observed_peak('test_outer') >= 8 * 1024 * 1024
+    assert observed_peak('test_inner') < 1024 * 1024
+
+def test_stage_times_without_tracing():
+    timings = {}
+    with metrics.stage('test_untraced', timings):
+        pass
+    assert 'test_untraced' in timings
+    assert observed_peak('test_untraced') is None
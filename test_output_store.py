@@ -0,0 +1,57 @@
+import gzip
+import json
+import pytest
+from output_store import OutputStore
+
+PAPER = {
+    'mcq': [{'question': 'Which is a noble gas?', 'options': ['Argon', 'Iron', 'Salt', 'Ice'], 'correct_answer': 'Argon'}],
+    'short_answer': [{'question': 'Define osmosis.', 'sample_answer': 'Diffusion of water — across a membrane.'}],
+    'long_answer': [],
+}
+
+def expected_json(questions):
+    return json.dumps(questions, indent=2, ensure_ascii=False).encode('utf-8')
+
+@pytest.mark.parametrize('encoding', ['gzip', 'identity'])
+def test_round_trip(tmp_path, encoding):
+    store = OutputStore(str(tmp_path), encoding)
+    store.save('questions_a.json', PAPER)
+    
+    assert store.read('questions_a.json') == expected_json(PAPER)
+    stream, stored_encoding = store.open('questions_a.json')
+    with stream:
+        assert stored_encoding == encoding
+        raw = stream.read()
+    assert (gzip.decompress(raw) if encoding == 'gzip' else raw) == expected_json(PAPER)
+
+def test_gzip_output_is_deterministic(tmp_path):
+    store = OutputStore(str(tmp_path))
+    store.save('a.json', PAPER)
+    store.save('b.json', PAPER)
+    assert (tmp_path / 'a.json.gz').read_bytes() == (tmp_path / 'b.json.gz').read_bytes()
+
+def test_writer_stores_only_on_success(tmp_path):
+    store = OutputStore(str(tmp_path))
+    with pytest.raises(RuntimeError):
+        with store.writer('failed.json') as writer:
+            writer.write('mcq', PAPER['mcq'][0])
+            raise RuntimeError("generation failed")
+    assert store.open('failed.json') is None
+    assert list(tmp_path.iterdir()) == []
+
+def test_reads_papers_stored_with_another_encoding(tmp_path):
+    (tmp_path / 'legacy.json').write_bytes(expected_json(PAPER))
+    store = OutputStore(str(tmp_path), 'gzip')
+    assert store.read('legacy.json') == expected_json(PAPER)
+    stream, encoding = store.open('legacy.json')
+    stream.close()
+    assert encoding == 'identity'
+
+def test_missing_paper(tmp_path):
+    store = OutputStore(str(tmp_path))
+    assert store.open('missing.json') is None
+    assert store.read('missing.json') is None
+
+def test_unsupported_encoding(tmp_path):
+    with pytest.raises(ValueError):
+        OutputStore(str(tmp_path), 'brotli')
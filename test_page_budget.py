@@ -0,0 +1,95 @@
+import time
+from types import SimpleNamespace
+import pytest
+from document_processor import parse_page_ranges, expand_page_ranges, select_page_ranges
+from page_budget import PageBudget, stratified_page_order, SENTENCES_PER_QUESTION
+
+REQUIREMENTS = {'mcq_count': 0, 'short_answer_count': 5, 'long_answer_count': 0}
+
+def analysis_with(sentences, paragraphs=0):
+    """Stand-in exposing only what candidate_coverage reads"""
+    return SimpleNamespace(sentences=[''] * sentences, paragraphs=[(0, 1)] * paragraphs, key_terms=[],
+                           sentences_with_terms=lambda terms: [])
+
+def test_parse_page_ranges_merges_and_sorts():
+    assert parse_page_ranges("15, 1-10,3-4, 11") == [(0, 11), (14, 15)]
+    assert parse_page_ranges("7") == [(6, 7)]
+
+@pytest.mark.parametrize('spec', ["", " , ", "0", "5-3", "x", "2-y"])
+def test_parse_page_ranges_rejects_invalid(spec):
+    with pytest.raises(ValueError):
+        parse_page_ranges(spec)
+
+def test_huge_page_range_is_not_expanded():
+    start = time.perf_counter()
+    ranges = parse_page_ranges("1-1000000000")
+    assert ranges == [(0, 1000000000)]
+    assert expand_page_ranges(ranges, 12) == list(range(12))
+    assert time.perf_counter() - start < 1
+
+def test_expand_page_ranges_clamps_to_page_count():
+    assert expand_page_ranges([(0, 2), (5, 9)], 7) == [0, 1, 5, 6]
+    assert expand_page_ranges([(20, 30)], 7) == []
+
+def test_select_page_ranges_stops_after_last_range():
+    def segments():
+        for page in range(100):
+            yield f"page {page}", 0, page
+            if page > 10:
+                raise AssertionError("read past the last range")
+    
+    assert [s[2] for s in select_page_ranges(segments(), [(1, 3), (8, 10)])] == [1, 2, 8, 9]
+
+def test_stratified_order_covers_every_page_once():
+    order = stratified_page_order(13)
+    assert sorted(order) == list(range(13))
+    assert order[:4] == [0, 8, 4, 12]
+
+def test_budget_samples_min_pages_spread_over_the_document():
+    budget = PageBudget(100, REQUIREMENTS, min_pages=4)
+    # Bit-reversed order over the next power of two (128)
+    assert budget.pages == [0, 32, 64, 96]
+    assert not budget.complete
+
+def test_budget_samples_within_explicit_ranges():
+    budget = PageBudget(100, REQUIREMENTS, parse_page_ranges("11-20,1000000"), min_pages=4)
+    assert len(budget.pages) == 4
+    assert all(10 <= page < 20 for page in budget.pages)
+
+def test_budget_short_documents_are_read_in_full():
+    budget = PageBudget(6, REQUIREMENTS, min_pages=10)
+    assert budget.pages == list(range(6))
+    assert budget.complete
+    assert budget.extend(analysis_with(0)) is None
+
+def test_budget_unknown_page_count_reads_everything():
+    budget = PageBudget(None, REQUIREMENTS, parse_page_ranges("1-3"))
+    assert budget.pages is None
+    assert budget.complete
+
+def test_budget_grows_with_the_shortfall():
+    wanted = REQUIREMENTS['short_answer_count'] * SENTENCES_PER_QUESTION
+    
+    # Nothing found: the sample doubles
+    budget = PageBudget(1000, REQUIREMENTS, min_pages=10)
+    assert len(budget.extend(analysis_with(0))) == 20
+    
+    # A tenth of the candidates: grows 1.2 / 0.1 = 12 times
+    budget = PageBudget(1000, REQUIREMENTS, min_pages=10)
+    assert len(budget.extend(analysis_with(wanted // 10))) == 120
+    
+    # Enough candidates: stop
+    budget = PageBudget(1000, REQUIREMENTS, min_pages=10)
+    assert budget.extend(analysis_with(wanted)) is None
+    assert len(budget.pages) == 10
+
+def test_budget_growth_keeps_the_earlier_sample():
+    budget = PageBudget(1000, REQUIREMENTS, min_pages=10)
+    first = set(budget.pages)
+    grown = budget.extend(analysis_with(0))
+    assert first <= set(grown)
+    
+    while budget.extend(analysis_with(0)) is not None:
+        pass
+    assert budget.complete
+    assert budget.pages == list(range(1000))
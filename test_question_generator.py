@@ -0,0 +1,33 @@
+import pytest
+from question_generator import QuestionGenerator, nltk_data_available
+
+pytestmark = pytest.mark.skipif(not nltk_data_available(), reason="NLTK data is not installed")
+
+CONTENT = """Machine learning is a field of artificial intelligence that builds statistical models from data.
+Supervised learning trains models on labelled examples, while unsupervised learning finds structure in unlabelled data.
+
+Neural networks are layered models of weighted connections. Deep learning stacks many layers to learn
+hierarchical representations of images, speech and natural language.
+
+Reinforcement learning agents learn policies by trial and error, maximizing a cumulative reward signal.
+Evaluation of models relies on held-out test data, cross validation and metrics such as accuracy and recall.
+"""
+
+REQUIREMENTS = {'mcq_count': 3, 'short_answer_count': 2, 'long_answer_count': 1, 'difficulty': 'medium'}
+
+@pytest.fixture(scope='module')
+def generator():
+    return QuestionGenerator()
+
+def test_iter_questions_matches_generate_questions(generator):
+    analysis = generator.analyze(CONTENT)
+    streamed = {'mcq': [], 'short_answer': [], 'long_answer': []}
+    for question_type, question in generator.iter_questions(analysis, REQUIREMENTS, seed=11):
+        streamed[question_type].append(question)
+    
+    assert streamed == generator.generate_questions(analysis, REQUIREMENTS, seed=11)
+    assert any(streamed.values())
+
+def test_same_seed_gives_the_same_paper(generator):
+    first = generator.generate_questions(CONTENT, REQUIREMENTS, seed=5)
+    assert generator.generate_questions(CONTENT, REQUIREMENTS, seed=5) == first
@@ -0,0 +1,74 @@
+import random
+import numpy as np
+import pytest
+from document_analysis import DocumentAnalysis
+from question_generator import nltk_data_available
+from question_scheduler import QuestionScheduler, StratifiedPool
+
+needs_nltk = pytest.mark.skipif(not nltk_data_available(), reason="NLTK data is not installed")
+
+# 4 sections of 25 ids each
+STRATA = np.repeat(np.arange(4), 25)
+
+def draw_all(pool):
+    drawn = []
+    while True:
+        item = pool.draw()
+        if item is None:
+            return drawn
+        drawn.append(item)
+
+def test_draws_are_spread_across_sections():
+    pool = StratifiedPool([range(100)], STRATA, random.Random(1))
+    drawn = [pool.draw() for _ in range(8)]
+    
+    assert sorted(np.bincount(STRATA[drawn], minlength=4)) == [2, 2, 2, 2]
+
+def test_draws_never_repeat_and_end_with_none():
+    pool = StratifiedPool([range(100)], STRATA, random.Random(2))
+    
+    drawn = draw_all(pool)
+    
+    assert sorted(drawn) == list(range(100))
+    assert len(pool) == 0
+    assert pool.draw() is None
+
+def test_tiers_are_drawn_in_order_and_used_ids_skipped():
+    used = np.zeros(100, dtype=bool)
+    used[[0, 1, 50]] = True
+    pool = StratifiedPool([range(0, 10), range(10, 100)], STRATA, random.Random(3), used)
+    
+    drawn = draw_all(pool)
+    
+    assert sorted(drawn[:8]) == list(range(2, 10))
+    assert 50 not in drawn and len(drawn) == 97
+
+def test_seeded_pools_draw_the_same_order():
+    first = draw_all(StratifiedPool([range(100)], STRATA, random.Random(4)))
+    assert draw_all(StratifiedPool([range(100)], STRATA, random.Random(4))) == first
+
+@pytest.fixture
+def scheduler():
+    content = ("Photosynthesis converts light into chemical energy. Chlorophyll absorbs light in leaves.\n\n"
+               "Photosynthesis converts light into chemical energy. Roots absorb water from the soil.")
+    analysis = DocumentAnalysis(content, {'into', 'in', 'from', 'the'})
+    return QuestionScheduler(analysis, random.Random(5))
+
+@needs_nltk
+def test_repeated_sentences_are_skipped(scheduler):
+    assert scheduler.used_sentences.tolist() == [False, False, True, False]
+    assert 2 not in draw_all(scheduler.short_answer_sentences)
+
+@needs_nltk
+def test_use_concept_rejects_repeats_within_a_type(scheduler):
+    assert scheduler.use_concept('mcq', 'Energy')
+    assert not scheduler.use_concept('mcq', 'energy')
+    assert scheduler.use_concept('long_answer', 'energy')
+
+@needs_nltk
+def test_pick_concept_prefers_fresh_concepts(scheduler):
+    scheduler.use_concept('mcq', 'light')
+    
+    assert scheduler.pick_concept('short_answer', ['light', 'leaves']) == 'leaves'
+    assert scheduler.pick_concept('short_answer', ['light', 'leaves']) == 'light'
+    assert scheduler.pick_concept('short_answer', ['Light', 'leaves']) is None
@@ -0,0 +1,40 @@
+import io
+import json
+import pytest
+from output_files import QuestionWriter
+from output_store import dumps
+
+PAPERS = [
+    {'mcq': [], 'short_answer': [], 'long_answer': []},
+    {
+        'mcq': [{'question': 'Which gas do plants absorb?', 'options': ['CO2', 'O2', 'N2', 'He'],
+                 'correct_answer': 'CO2', 'difficulty': 'easy'},
+                {'question': 'Pick the odd one out: "café", naïve, ☃', 'options': [], 'correct_answer': None}],
+        'short_answer': [],
+        'long_answer': [{'question': 'Discuss.', 'detailed_answer': 'Line one.\nLine two.', 'marks': 5}],
+    },
+    {'mcq': [], 'short_answer': [{'question': 'Only one?', 'sample_answer': 'Yes', 'nested': {'a': [1, {}]}}],
+     'long_answer': []},
+]
+
+def write(questions, dumps=None):
+    f = io.StringIO()
+    writer = QuestionWriter(f, dumps)
+    for question_type in QuestionWriter.SECTIONS:
+        for question in questions[question_type]:
+            writer.write(question_type, question)
+    writer.close()
+    return f.getvalue()
+
+@pytest.mark.parametrize('questions', PAPERS)
+@pytest.mark.parametrize('encoder', [None, dumps], ids=['json', 'output_store'])
+def test_output_matches_json_dump(questions, encoder):
+    expected = io.StringIO()
+    json.dump(questions, expected, indent=2, ensure_ascii=False)
+    assert write(questions, encoder) == expected.getvalue()
+
+def test_sections_must_come_in_order():
+    writer = QuestionWriter(io.StringIO())
+    writer.write('short_answer', {'question': 'q'})
+    with pytest.raises(ValueError):
+        writer.write('mcq', {'question': 'q'})
@@ -0,0 +1,38 @@
+from result_cache import ResultCache
+
+REQUIREMENTS = {'mcq_count': 5, 'short_answer_count': 3, 'long_answer_count': 2, 'difficulty': 'medium', 'pages': None}
+PAPER = {'mcq': [{'question': 'Q?'}], 'short_answer': [], 'long_answer': []}
+
+def test_hit_and_miss():
+    cache = ResultCache()
+    key = ResultCache.key('hash', REQUIREMENTS, 7)
+    assert cache.get(key) is None
+    
+    cache.put(key, PAPER)
+    
+    assert cache.get(key) == PAPER
+    assert cache.get(ResultCache.key('other', REQUIREMENTS, 7)) is None
+    assert cache.get(ResultCache.key('hash', dict(REQUIREMENTS, mcq_count=6), 7)) is None
+
+def test_key_includes_the_seed():
+    assert ResultCache.key('hash', REQUIREMENTS, 1) != ResultCache.key('hash', REQUIREMENTS, 2)
+    # Requirement order doesn't matter
+    reordered = dict(reversed(list(REQUIREMENTS.items())))
+    assert ResultCache.key('hash', reordered, 1) == ResultCache.key('hash', REQUIREMENTS, 1)
+
+def test_least_recently_used_paper_is_dropped():
+    cache = ResultCache(max_entries=2)
+    first, second, third = (ResultCache.key(name, REQUIREMENTS, 1) for name in 'abc')
+    cache.put(first, PAPER)
+    cache.put(second, PAPER)
+    cache.get(first)
+    cache.put(third, PAPER)
+    
+    assert cache.get(second) is None
+    assert cache.get(first) == PAPER
+    assert len(cache) == 2
+
+def test_disabled_cache_keeps_nothing():
+    cache = ResultCache(max_entries=0)
+    cache.put(ResultCache.key('hash', REQUIREMENTS, 1), PAPER)
+    assert len(cache) == 0
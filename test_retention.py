@@ -0,0 +1,73 @@
+import os
+import time
+from retention import RetentionPolicy
+
+HOUR = 3600
+
+def make_entry(directory, name, size, age, is_dir=False):
+    path = os.path.join(directory, name)
+    if is_dir:
+        os.makedirs(path)
+        with open(os.path.join(path, 'part'), 'wb') as f:
+            f.write(b'x' * size)
+    else:
+        with open(path, 'wb') as f:
+            f.write(b'x' * size)
+    mtime = time.time() - age
+    os.utime(path, (mtime, mtime))
+    return path
+
+def test_removes_entries_older_than_max_age(tmp_path):
+    make_entry(tmp_path, 'old.json.gz', 10, 10 * HOUR)
+    make_entry(tmp_path, 'old.json.gz.tmp', 10, 10 * HOUR)
+    make_entry(tmp_path, 'olddir', 10, 10 * HOUR, is_dir=True)
+    make_entry(tmp_path, 'new.json.gz', 10, 60)
+    
+    removed = RetentionPolicy([str(tmp_path)], max_age=HOUR).collect()
+    
+    assert removed == 3
+    assert os.listdir(tmp_path) == ['new.json.gz']
+
+def test_quota_removes_oldest_first(tmp_path):
+    for age, name in [(5, 'a'), (4, 'b'), (3, 'c'), (2, 'd')]:
+        make_entry(tmp_path, name, 100, age * HOUR)
+    
+    removed = RetentionPolicy([str(tmp_path)], max_bytes=250, min_age=HOUR).collect()
+    
+    assert removed == 2
+    assert sorted(os.listdir(tmp_path)) == ['c', 'd']
+
+def test_quota_spares_recent_and_in_progress_entries(tmp_path):
+    make_entry(tmp_path, 'old', 100, 5 * HOUR)
+    make_entry(tmp_path, 'writing.tmp', 100, 4 * HOUR)
+    make_entry(tmp_path, 'running_batch', 100, 60, is_dir=True)
+    make_entry(tmp_path, 'just_returned.json.gz', 100, 1)
+    
+    removed = RetentionPolicy([str(tmp_path)], max_bytes=1, min_age=HOUR).collect()
+    
+    assert removed == 1
+    assert sorted(os.listdir(tmp_path)) == ['just_returned.json.gz', 'running_batch', 'writing.tmp']
+
+def test_missing_directories_are_skipped(tmp_path):
+    assert RetentionPolicy([str(tmp_path / 'missing')], max_age=1, max_bytes=1).collect() == 0
+
+def test_thread_starts_only_with_a_limit():
+    idle = RetentionPolicy([], interval=0.01)
+    idle.start()
+    assert idle._thread is None
+    
+    policy = RetentionPolicy([], max_age=1, interval=0.01)
+    policy.start()
+    assert policy._thread.is_alive()
+    policy.stop()
+    policy._thread.join(1)
+    assert not policy._thread.is_alive()
+
+def test_keeps_hidden_files(tmp_path):
+    make_entry(tmp_path, '.gitkeep', 0, 30 * 24 * HOUR)
+    make_entry(tmp_path, 'old.json.gz', 10, 30 * 24 * HOUR)
+    
+    removed = RetentionPolicy([str(tmp_path)], max_age=HOUR, max_bytes=1, min_age=0).collect()
+    
+    assert removed == 1
+    assert os.listdir(tmp_path) == ['.gitkeep']
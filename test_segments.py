@@ -0,0 +1,33 @@
+import pickle
+from segments import TextTable
+
+def test_text_table_rows_and_spans():
+    table = TextTable(' ')
+    for sentence in ["First sentence.", "", "Third one?"]:
+        table.add(sentence)
+    
+    assert len(table) == 3
+    assert list(table) == ["First sentence.", "", "Third one?"]
+    assert table[2] == "Third one?"
+    assert table[-1] == "Third one?"
+    assert table[0:2] == ["First sentence.", ""]
+    assert table.span(0, 3) == ' '.join(table[0:3])
+    assert table.span(2, 3) == "Third one?"
+    assert table.span(1, 1) == ''
+
+def test_text_table_adds_after_reading():
+    table = TextTable('\n')
+    table.add("a")
+    assert table.text == "a"
+    table.add("b")
+    assert table.text == "a\nb"
+    assert table[1] == "b"
+
+def test_text_table_pickles_its_text():
+    table = TextTable(' ')
+    table.add("One.")
+    table.add("Two.")
+    copy = pickle.loads(pickle.dumps(table))
+    assert list(copy) == ["One.", "Two."]
+    copy.add("Three.")
+    assert copy.span(0, 3) == "One. Two. Three."
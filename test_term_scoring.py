@@ -0,0 +1,47 @@
+import numpy as np
+import pytest
+from scipy import sparse
+from document_analysis import DocumentAnalysis, TERM_PHRASE
+from question_generator import nltk_data_available
+from term_scoring import TermScorer
+
+needs_nltk = pytest.mark.skipif(not nltk_data_available(), reason="NLTK data is not installed")
+
+# Term 0 is repeated in one unit, term 1 occurs once in three units, term 2 once in every unit
+BURST, SPREAD, FILLER = 0, 1, 2
+COUNTS = sparse.csr_matrix(np.array([[5, 0, 1], [0, 1, 1], [0, 1, 1], [0, 1, 1], [0, 0, 1], [0, 0, 1]]))
+
+def test_bm25_saturates_term_frequency_and_ignores_common_terms():
+    assert TermScorer(COUNTS, 'bm25').top_terms(3).tolist() == [BURST, SPREAD, FILLER]
+    # TF-IDF keeps counting repeats, so a term in every unit outranks a rarer one
+    assert TermScorer(COUNTS, 'tfidf').top_terms(3).tolist() == [BURST, FILLER, SPREAD]
+
+def test_section_units_prefer_topical_terms():
+    # 4 sections of 2 sentences: term 0 fills section 0, term 1 occurs once in every section
+    counts = np.zeros((8, 2))
+    counts[[0, 1], 0] = 1
+    counts[[0, 2, 4, 6], 1] = 1
+    sections = np.repeat(np.arange(4), 2)
+    
+    assert TermScorer(sparse.csr_matrix(counts), 'bm25').top_terms(2).tolist() == [1, 0]
+    assert TermScorer(sparse.csr_matrix(counts), 'bm25', sections).top_terms(2).tolist() == [0, 1]
+
+def test_top_terms():
+    scorer = TermScorer(COUNTS, 'bm25')
+    assert scorer.top_terms(1).tolist() == [BURST]
+    assert scorer.top_terms(10).tolist() == [BURST, SPREAD, FILLER]
+    assert scorer.top_terms(0).tolist() == []
+
+def test_unknown_method():
+    with pytest.raises(ValueError):
+        TermScorer(COUNTS, 'lsa')
+
+@needs_nltk
+def test_phrases_are_cut_to_max_ngram_words():
+    def phrases(max_ngram):
+        analysis = DocumentAnalysis("Protein sequence database search tools are fast.", {'are'}, max_ngram=max_ngram)
+        return [term for term, kind in zip(analysis.terms, analysis.term_kinds) if kind == TERM_PHRASE]
+    
+    assert phrases(1) == []
+    assert phrases(2) == ['search tools']
+    assert phrases(3) == ['database search tools']